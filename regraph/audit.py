@@ -11,6 +11,7 @@ from abc import ABC, abstractmethod
 
 import copy
 import datetime
+import logging
 import uuid
 import warnings
 
@@ -25,6 +26,9 @@ from regraph.rules import (compose_rules, Rule,
 from regraph.utils import keys_by_value
 
 
+logger = logging.getLogger(__name__)
+
+
 def _generate_new_commit_meta_data():
     time = datetime.datetime.now()
     commit_id = str(uuid.uuid4())
@@ -397,7 +401,7 @@ class Versioning(ABC):
                 self._invert_delta(head_to_merge))
             self._refine_delta(self._deltas[branch])
             self._heads[branch] = head_commit
-            print("Created the new head for '{}'".format(branch))
+            logger.debug("Created the new head for '%s'", branch)
 
         # All paths to the heads originating from the commit to
         # which we rollaback are removed
@@ -406,7 +410,7 @@ class Versioning(ABC):
                 self._revision_graph.remove_node(c)
                 if c in self._heads.values():
                     for h in keys_by_value(self._heads, c):
-                        print("Removed a head for '{}'".format(h))
+                        logger.debug("Removed a head for '%s'", h)
                         del self._heads[h]
 
     def _revision_graph_to_json(self):
@@ -124,6 +124,15 @@ def delete_var(var, detach=False, breakline=True):
     return "{}DELETE {}{}".format(detach, var, n)
 
 
+def quote_label(label):
+    """Quote a label (or a relationship type) to use it in a query.
+
+    Backticks inside the label are escaped, so that arbitrary graph
+    ids cannot break out of the label position of the query.
+    """
+    return "`{}`".format(str(label).replace("`", "``"))
+
+
 def set_labels(var_name, labels):
     """Set labels to a var."""
     query = ""
@@ -147,6 +156,15 @@ def set_id(node_label, old_id, new_id):
     return query
 
 
+def _finite_set_elements(value):
+    """Generate a comma-separated Cypher repr of the elements of a set."""
+    return ", ".join([
+        "'{}'".format(el.replace("'", "\\'")) if type(el) == str
+        else "{}".format(el)
+        for el in value
+    ])
+
+
 def set_attributes(var_name, attrs=None, update=False):
     """Generate a subquery to set the attributes for some variable."""
     query = ""
@@ -172,18 +190,11 @@ def set_attributes(var_name, attrs=None, update=False):
                     "Non universal RegexSet is not allowed as "
                     "an attribute value (not implemented)")
         elif isinstance(value, FiniteSet):
-            elements = []
-            for el in value:
-                if type(el) == str:
-                    elements.append("'{}'".format(el.replace("'", "\\'")))
-                else:
-                    elements.append("{}".format(el))
+            elements = _finite_set_elements(value)
             if value not in RESERVED_SET_NAMES:
-                query += "SET {}.{}=[{}]\n".format(var_name, k, ", ".join(
-                    el for el in elements))
+                query += "SET {}.{}=[{}]\n".format(var_name, k, elements)
             else:
-                query += "SET {}.{}={}\n".format(var_name, k, ", ".join(
-                    el for el in elements))
+                query += "SET {}.{}={}\n".format(var_name, k, elements)
         else:
             raise ValueError(
                 "Unknown type of attribute '{}': '{}'".format(
@@ -248,23 +259,24 @@ def generate_attributes(attrs):
                         "Non universal RegexSet is not allowed as "
                         "an attribute value (not implemented)")
             elif isinstance(value, FiniteSet):
-                elements = []
-                for el in value:
-                    if type(el) == str:
-                        elements.append("'{}'".format(el.replace("'", "\\'")))
-                    else:
-                        elements.append("{}".format(el))
-                attrs_items.append("{}: [{}]".format(k, ", ".join(
-                    el for el in elements)))
+                attrs_items.append("{}: [{}]".format(
+                    k, _finite_set_elements(value)))
             elif isinstance(value, UniversalSet):
                 attrs_items.append("{}: ['StringSet']\n".format(k))
             else:
                 raise ValueError(
                     "Unknown type of attribute '{}': '{}'".format(k, type(value)))
-        return ", ".join(i for i in attrs_items)
+        return ", ".join(attrs_items)
+
+
+def _id_repr(var_name, node_id, parameterized):
+    """Generate a repr of the node id (literal or query parameter)."""
+    if parameterized:
+        return "${}".format(var_name)
+    return "'{}'".format(node_id)
 
 
-def match_node(var_name, node_id, node_label):
+def match_node(var_name, node_id, node_label, parameterized=False):
     """Query to match a node into the variable.
 
     Parameters
@@ -275,12 +287,15 @@ def match_node(var_name, node_id, node_label):
         Id of the node to match
     label
         Label of the node to match, default is 'node'
+    parameterized : bool, optional
+        If True, the id is not inlined in the query, it is
+        expected to be passed as the query parameter `$<var_name>`
     """
-    return "MATCH ({}:{} {{ id : '{}' }})\n".format(
-        var_name, node_label, node_id)
+    return "MATCH ({}:{} {{ id : {} }})\n".format(
+        var_name, node_label, _id_repr(var_name, node_id, parameterized))
 
 
-def match_nodes(var_id_dict, node_label=None):
+def match_nodes(var_id_dict, node_label=None, parameterized=False):
     """Match a collection of nodes by their id.
 
     Parameters
@@ -291,6 +306,9 @@ def match_nodes(var_id_dict, node_label=None):
         to match
     label : str
         Label of the nodes to match
+    parameterized : bool, optional
+        If True, the ids are not inlined in the query, they are
+        expected to be passed as the query parameters `$<var_name>`
     """
     node_label_str = ""
     if node_label:
@@ -298,14 +316,15 @@ def match_nodes(var_id_dict, node_label=None):
 
     query =\
         "MATCH " +\
-        ", ".join("({}{} {{ id : '{}'}}) ".format(
-            var_name, node_label_str, node_id)
+        ", ".join("({}{} {{ id : {}}}) ".format(
+            var_name, node_label_str,
+            _id_repr(var_name, node_id, parameterized))
             for var_name, node_id in var_id_dict.items()) + " "
     return query
 
 
 def match_edge(u_var, v_var, u_id, v_id, edge_var, u_label, v_label,
-               edge_label='edge'):
+               edge_label='edge', parameterized=False):
     """Query for matching an edge.
 
     Parameters
@@ -324,10 +343,16 @@ def match_edge(u_var, v_var, u_id, v_id, edge_var, u_label, v_label,
         Name of the variable to use for the matched edge
     label
         Label of the edge to match, default is 'edge'
+    parameterized : bool, optional
+        If True, the ids are not inlined in the query, they are
+        expected to be passed as the query parameters `$<u_var>`
+        and `$<v_var>`
     """
     query =\
-        "MATCH ({}:{} {{id: '{}'}})-[{}:{}]->({}:{} {{id: '{}'}})\n".format(
-            u_var, u_label, u_id, edge_var, edge_label, v_var, v_label, v_id)
+        "MATCH ({}:{} {{id: {}}})-[{}:{}]->({}:{} {{id: {}}})\n".format(
+            u_var, u_label, _id_repr(u_var, u_id, parameterized),
+            edge_var, edge_label,
+            v_var, v_label, _id_repr(v_var, v_id, parameterized))
     return query
 
 
@@ -492,6 +517,37 @@ def constraint_query(node_var, node_label, node_property):
     return query
 
 
+def create_nodes_from_list(node_label):
+    """Generate a query creating a batch of nodes.
+
+    The query expects the parameter `$nodes` containing a list
+    of maps of the form {id: <node_id>, attrs: <json_attrs>}.
+    """
+    query = (
+        "UNWIND $nodes AS node\n" +
+        "CREATE (n:{} {{ id: node.id }})\n".format(node_label) +
+        "SET n += node.attrs\n"
+    )
+    return query
+
+
+def create_edges_from_list(node_label, edge_label):
+    """Generate a query creating a batch of edges.
+
+    The query expects the parameter `$edges` containing a list
+    of maps of the form {source: <source_id>, target: <target_id>,
+    attrs: <json_attrs>}.
+    """
+    query = (
+        "UNWIND $edges AS edge\n" +
+        "MATCH (s:{} {{ id: edge.source }}), (t:{} {{ id: edge.target }})\n".format(
+            node_label, node_label) +
+        "CREATE (s)-[r:{}]->(t)\n".format(edge_label) +
+        "SET r = edge.attrs\n"
+    )
+    return query
+
+
 def merge_properties(var_list, new_props_var, carry_vars=None,
                      method='union'):
     """Merge properties of a list of nodes/edges.
@@ -2,6 +2,7 @@
 import networkx as nx
 import warnings
 
+from regraph.attribute_sets import FiniteSet
 from regraph.exceptions import (TypingWarning, InvalidHomomorphism)
 from regraph.utils import (keys_by_value,
                            generate_new_id,
@@ -23,6 +24,9 @@ from . import generic
 from . import rewriting
 
 
+# Cypher repr of the attributes tagging not yet checked typing edges
+TMP_TYPING_ATTRS = generic.generate_attributes({'tmp': FiniteSet(['true'])})
+
 # def check_functional()
 
 def get_typing(domain, codomain, typing_label, attrs=None):
@@ -54,6 +58,28 @@ def set_intergraph_edge(domain, codomain, domain_node,
     return query
 
 
+def set_intergraph_edges(domain, codomain, typing_label, attrs=None,
+                         attrs_repr=None):
+    """Generate a query setting a batch of edges between two graphs.
+
+    The query expects the parameter `$pairs` containing a list of
+    maps of the form `{source: <domain_node>, target: <codomain_node>}`,
+    so that its text depends only on the graph labels and can be
+    cached by Neo4j. If `attrs_repr` is specified, it is used as
+    an already generated Cypher repr of the edge attributes.
+    """
+    if attrs_repr is None:
+        attrs_repr = generic.generate_attributes(attrs)
+    query = (
+        "UNWIND $pairs AS pair\n" +
+        "MATCH (n:{} {{ id: pair.source }}), (m:{} {{ id: pair.target }})\n".format(
+            domain, codomain) +
+        "MERGE (n)-[:{}  {{ {} }}]->(m)".format(
+            typing_label, attrs_repr)
+    )
+    return query
+
+
 def check_homomorphism(tx, domain, codomain, total=True):
     """Check if the homomorphism is valid.
 
@@ -63,8 +89,10 @@ def check_homomorphism(tx, domain, codomain, total=True):
         Variable of a cypher transaction
     domain : str
         Label of the graph at the domain of the homomorphism
+        (quoted with `generic.quote_label`)
     codmain : str
         Label of the graph at the codomain of the homomorphism
+        (quoted with `generic.quote_label`)
 
     Raises
     ------
@@ -87,18 +115,6 @@ def check_homomorphism(tx, domain, codomain, total=True):
         "RETURN n.id as ids, size(images) as nb_of_img\n"
     )
 
-    result = tx.run(query1)
-    nodes = []
-
-    for record in result:
-        nodes.append((record['ids'], record['nb_of_img']))
-    if len(nodes) != 0:
-        raise InvalidHomomorphism(
-            "Wrong number of images!\n" +
-            "\n".join(
-                ["The node '{}' of the graph {} have {} image(s) in the graph {}.".format(
-                    n, domain, str(nb), codomain) for n, nb in nodes]))
-
     # Check if all the edges of the domain have an image
     query2 = (
         "MATCH (n:{})-[:edge]->(m:{})\n".format(
@@ -112,19 +128,6 @@ def check_homomorphism(tx, domain, codomain, total=True):
         "RETURN x_id, y_id\n"
     )
 
-    result = tx.run(query2)
-    xy_ids = []
-    for record in result:
-        xy_ids.append((record['x_id'], record['y_id']))
-    if len(xy_ids) != 0:
-        raise InvalidHomomorphism(
-            "Edges are not preserved in the homomorphism from '{}' to '{}': ".format(
-                domain, codomain) +
-            "Was expecting edges {}".format(
-                ", ".join(
-                    "'{}'->'{}'".format(x, y) for x, y in xy_ids))
-        )
-
     # "CASE WHEN size(apoc.text.regexGroups(m_props, 'IntegerSet\\[(\\d+|minf)-(\\d+|inf)\\]') AS value"
 
     # Check if all the attributes of a node of the domain are in its image
@@ -147,18 +150,6 @@ def check_homomorphism(tx, domain, codomain, total=True):
         "RETURN n_id, m_id, invalid\n"
     )
 
-    result = tx.run(query3)
-    invalid_typings = []
-    for record in result:
-        invalid_typings.append((record['n_id'], record['m_id']))
-    if len(invalid_typings) != 0:
-        raise InvalidHomomorphism(
-            "Node attributes are not preserved in the homomorphism from '{}' to '{}': ".format(
-                domain, codomain) +
-            "\n".join(["Attributes of nodes source: '{}' ".format(n) +
-                       "and target: '{}' do not match!".format(m)
-                       for n, m in invalid_typings]))
-
     # Check if all the attributes of an edge of the domain are in its image
     query4 = (
         "MATCH (n:{})-[rel_orig:edge]->(m:{})\n".format(
@@ -182,9 +173,49 @@ def check_homomorphism(tx, domain, codomain, total=True):
         "WHERE invalid <> 0\n" +
         "RETURN n_id, m_id, x_id, y_id, invalid\n"
     )
-    result = tx.run(query4)
+
+    # All the checks are sent at once (the transaction pipelines
+    # them), the results are consumed only afterwards
+    result1 = tx.run(query1)
+    result2 = tx.run(query2)
+    result3 = tx.run(query3)
+    result4 = tx.run(query4)
+
+    nodes = []
+    for record in result1:
+        nodes.append((record['ids'], record['nb_of_img']))
+    if len(nodes) != 0:
+        raise InvalidHomomorphism(
+            "Wrong number of images!\n" +
+            "\n".join(
+                ["The node '{}' of the graph {} have {} image(s) in the graph {}.".format(
+                    n, domain, str(nb), codomain) for n, nb in nodes]))
+
+    xy_ids = []
+    for record in result2:
+        xy_ids.append((record['x_id'], record['y_id']))
+    if len(xy_ids) != 0:
+        raise InvalidHomomorphism(
+            "Edges are not preserved in the homomorphism from '{}' to '{}': ".format(
+                domain, codomain) +
+            "Was expecting edges {}".format(
+                ", ".join(
+                    "'{}'->'{}'".format(x, y) for x, y in xy_ids))
+        )
+
+    invalid_typings = []
+    for record in result3:
+        invalid_typings.append((record['n_id'], record['m_id']))
+    if len(invalid_typings) != 0:
+        raise InvalidHomomorphism(
+            "Node attributes are not preserved in the homomorphism from '{}' to '{}': ".format(
+                domain, codomain) +
+            "\n".join(["Attributes of nodes source: '{}' ".format(n) +
+                       "and target: '{}' do not match!".format(m)
+                       for n, m in invalid_typings]))
+
     invalid_edges = []
-    for record in result:
+    for record in result4:
         invalid_edges.append((record['n_id'], record['m_id'],
                               record['x_id'], record['y_id']))
     if len(invalid_edges) != 0:
@@ -810,18 +841,20 @@ def get_rule_liftings(tx, graph_id, rule, instance, p_typing=None):
         match_instance_vars = {lhs_vars[k]: v for k, v in instance.items()}
 
         # Match nodes
-        query = "// Match nodes the instance of the rewritten graph \n"
-        query += "MATCH {}".format(
-            ", ".join([
-                "({}:{} {{id: '{}'}})".format(k, graph_id, v)
-                for k, v in match_instance_vars.items()
-            ])
-        )
-        query += "\n\n"
+        query_parts = [
+            "// Match nodes the instance of the rewritten graph \n",
+            "MATCH {}".format(
+                ", ".join([
+                    "({}:{} {{id: '{}'}})".format(k, graph_id, v)
+                    for k, v in match_instance_vars.items()
+                ])
+            ),
+            "\n\n"
+        ]
 
         carry_vars = list(lhs_vars.values())
         for k, v in lhs_vars.items():
-            query += (
+            query_parts.append(
                 "OPTIONAL MATCH (n)-[:typing*1..]->({})\n".format(v) +
                 "WITH {} \n".format(
                     ", ".join(carry_vars + [
@@ -833,14 +866,16 @@ def get_rule_liftings(tx, graph_id, rule, instance, p_typing=None):
         # Match edges
         for (u, v) in rule.lhs.edges():
             edge_var = "{}_{}".format(lhs_vars[u], lhs_vars[v])
-            query += "OPTIONAL MATCH ({}_instance)-[{}:edge]->({}_instance)\n".format(
-                lhs_vars[u],
-                edge_var,
-                lhs_vars[v])
-            query += "WHERE ({})-[:typing*1..]->({}) AND ({})-[:typing*1..]->({})\n".format(
-                "{}_instance".format(lhs_vars[u]), lhs_vars[u],
-                "{}_instance".format(lhs_vars[v]), lhs_vars[v])
-            query += (
+            query_parts.append(
+                "OPTIONAL MATCH ({}_instance)-[{}:edge]->({}_instance)\n".format(
+                    lhs_vars[u],
+                    edge_var,
+                    lhs_vars[v]))
+            query_parts.append(
+                "WHERE ({})-[:typing*1..]->({}) AND ({})-[:typing*1..]->({})\n".format(
+                    "{}_instance".format(lhs_vars[u]), lhs_vars[u],
+                    "{}_instance".format(lhs_vars[v]), lhs_vars[v]))
+            query_parts.append(
                 "WITH {} \n".format(
                     ", ".join(carry_vars + [
                         "collect({{type: 'edge', source: {}.id, target: {}.id, attrs: properties({}), graph:labels({})[0]}}) as {}\n".format(
@@ -853,12 +888,12 @@ def get_rule_liftings(tx, graph_id, rule, instance, p_typing=None):
                 )
             )
             carry_vars.append(edge_var)
-        query += "RETURN {}".format(
+        query_parts.append("RETURN {}".format(
             ", ".join(
                 ["{}_dict as {}".format(v, v) for v in lhs_vars.values()] +
-                ["{}_{}".format(lhs_vars[u], lhs_vars[v]) for u, v in rule.lhs.edges()]))
+                ["{}_{}".format(lhs_vars[u], lhs_vars[v]) for u, v in rule.lhs.edges()])))
 
-        result = tx.run(query)
+        result = tx.run("".join(query_parts))
         record = result.single()
         l_g_ls = {}
         lhs_nodes = {}
@@ -969,18 +1004,20 @@ def get_rule_projections(tx, hierarchy, graph_id, rule, instance, rhs_typing=Non
             }
 
             # Match nodes
-            query = "// Match nodes the instance of the rewritten graph \n"
-            query += "MATCH {}".format(
-                ", ".join([
-                    "({}:{} {{id: '{}'}})".format(k, graph_id, v)
-                    for k, v in match_instance_vars.items()
-                ])
-            )
-            query += "\n\n"
+            query_parts = [
+                "// Match nodes the instance of the rewritten graph \n",
+                "MATCH {}".format(
+                    ", ".join([
+                        "({}:{} {{id: '{}'}})".format(k, graph_id, v)
+                        for k, v in match_instance_vars.items()
+                    ])
+                ),
+                "\n\n"
+            ]
 
             carry_vars = list(lhs_vars.values())
             for k, v in lhs_vars.items():
-                query += (
+                query_parts.append(
                     "OPTIONAL MATCH (n)<-[:typing*1..]-({})\n".format(v) +
                     "WITH {} \n".format(
                         ", ".join(
@@ -994,14 +1031,16 @@ def get_rule_projections(tx, hierarchy, graph_id, rule, instance, rhs_typing=Non
             # Match edges
             for (u, v) in rule.p.edges():
                 edge_var = "{}_{}".format(lhs_vars[u], lhs_vars[v])
-                query += "OPTIONAL MATCH ({}_instance)-[{}:edge]->({}_instance)\n".format(
-                    lhs_vars[u],
-                    edge_var,
-                    lhs_vars[v])
-                query += "WHERE ({})<-[:typing*1..]-({}) AND ({})<-[:typing*1..]-({})\n".format(
-                    "{}_instance".format(lhs_vars[u]), lhs_vars[u],
-                    "{}_instance".format(lhs_vars[v]), lhs_vars[v])
-                query += (
+                query_parts.append(
+                    "OPTIONAL MATCH ({}_instance)-[{}:edge]->({}_instance)\n".format(
+                        lhs_vars[u],
+                        edge_var,
+                        lhs_vars[v]))
+                query_parts.append(
+                    "WHERE ({})<-[:typing*1..]-({}) AND ({})<-[:typing*1..]-({})\n".format(
+                        "{}_instance".format(lhs_vars[u]), lhs_vars[u],
+                        "{}_instance".format(lhs_vars[v]), lhs_vars[v]))
+                query_parts.append(
                     "WITH {} \n".format(
                         ", ".join(carry_vars + [
                             "collect({{type: 'edge', source: {}.id, target: {}.id, graph:labels({})[0], attrs: properties({})}}) as {}\n".format(
@@ -1014,12 +1053,12 @@ def get_rule_projections(tx, hierarchy, graph_id, rule, instance, rhs_typing=Non
                     )
                 )
                 carry_vars.append(edge_var)
-            query += "RETURN {}".format(
+            query_parts.append("RETURN {}".format(
                 ", ".join(
                     ["{}_dict as {}".format(v, v) for v in lhs_vars.values()] +
-                    ["{}_{}".format(lhs_vars[u], lhs_vars[v]) for u, v in rule.p.edges()]))
+                    ["{}_{}".format(lhs_vars[u], lhs_vars[v]) for u, v in rule.p.edges()])))
 
-            result = tx.run(query)
+            result = tx.run("".join(query_parts))
             record = result.single()
 
             l_l_ts = {}
@@ -1,4 +1,8 @@
 """Collection of utils for Statement Results of queries."""
+import logging
+
+
+logger = logging.getLogger(__name__)
 
 
 def execution_time(result):
@@ -12,7 +16,7 @@ def total_db_hits(result):
     """Return the # of db hits of the query."""
     profile = result.summary().profile
     if profile is None:
-        print("The query must be profiled to access the # of hits.")
+        logger.warning("The query must be profiled to access the # of hits.")
     else:
         return total_db_hits_profile(profile)
 
@@ -30,7 +34,7 @@ def total_rows(result):
     """Return the # of rows of the query."""
     profile = result.summary().profile
     if profile is None:
-        print("The query must be profiled to access the # of rows.")
+        logger.warning("The query must be profiled to access the # of rows.")
     else:
         return total_db_hits_profile(profile)
 
@@ -48,7 +52,7 @@ def total_cache_hits(result):
     """Return the # of cache hits of the query."""
     profile = result.summary().profile
     if profile is None:
-        print("The query must be profiled to access the # of hits.")
+        logger.warning("The query must be profiled to access the # of hits.")
     else:
         return total_cache_hits_profile(profile)
 
@@ -1483,18 +1483,19 @@ def rule_to_cypher(rule, instance, node_label="node",
 
     # Variables of the nodes of instance
     match_instance_vars = {lhs_vars[k]: v for k, v in instance.items()}
-    query = ""
+    # The query is assembled from a list of parts joined at the end
+    query_parts = []
 
     # If instance is not empty, generate Cypher that matches the nodes
     # of the instance
     if len(instance) > 0:
-        query += "// Match nodes and edges of the instance \n"
-        query += match_pattern_instance(
+        query_parts.append("// Match nodes and edges of the instance \n")
+        query_parts.append(match_pattern_instance(
             rule.lhs, lhs_vars, match_instance_vars,
-            node_label=node_label, edge_label=edge_label)
-        query += "\n\n"
+            node_label=node_label, edge_label=edge_label))
+        query_parts.append("\n\n")
     else:
-        query += "// Empty instance \n\n"
+        query_parts.append("// Empty instance \n\n")
 
     # Add instance nodes to the set of vars to carry
     carry_variables = set(match_instance_vars.keys())
@@ -1507,13 +1508,13 @@ def rule_to_cypher(rule, instance, node_label="node",
 
     # Generate cloning subquery
     for lhs_node, p_nodes in rule.cloned_nodes().items():
-        query += "// Cloning node '{}' of the lhs \n".format(lhs_node)
+        query_parts.append("// Cloning node '{}' of the lhs \n".format(lhs_node))
         clones = set()
         preds_to_ignore = dict()
         sucs_to_ignore = dict()
 
         # Set a p_node that will correspond to the original
-        fixed_node = generic.keys_by_value(
+        fixed_node = keys_by_value(
             preserved_nodes_index,
             min([preserved_nodes_index[p_node] for p_node in p_nodes]))[0]
         fixed_nodes[lhs_node] = fixed_node
@@ -1541,9 +1542,9 @@ def rule_to_cypher(rule, instance, node_label="node",
                                 instance[rule.p_lhs[u]])
                         else:
                             pred_vars_to_ignore.add(p_vars[u])
-            query +=\
-                "// Create clone corresponding to '{}' ".format(n) +\
-                "of the preserved part\n"
+            query_parts.append(
+                "// Create clone corresponding to '{}' ".format(n) +
+                "of the preserved part\n")
             if generate_var_ids:
                 clone_id_var = generic.generate_var_name()
             else:
@@ -1562,40 +1563,40 @@ def rule_to_cypher(rule, instance, node_label="node",
                 pred_vars_to_ignore=pred_vars_to_ignore,
                 carry_vars=carry_variables,
                 ignore_naming=True)
-            query += q
-            query += generic.with_vars(carry_variables)
-            query += "\n\n"
+            query_parts.append(q)
+            query_parts.append(generic.with_vars(carry_variables))
+            query_parts.append("\n\n")
 
     # Generate nodes removal subquery
     for node in rule.removed_nodes():
-        query += "// Removing node '{}' of the lhs \n".format(node)
-        query += remove_nodes([lhs_vars[node]])
+        query_parts.append("// Removing node '{}' of the lhs \n".format(node))
+        query_parts.append(remove_nodes([lhs_vars[node]]))
         carry_variables.remove(lhs_vars[node])
-        query += "\n"
+        query_parts.append("\n")
 
     # Generate edges removal subquery
     for u, v in rule.removed_edges():
         if rule.p_lhs[u] not in rule.cloned_nodes().keys() and\
            rule.p_lhs[v] not in rule.cloned_nodes().keys():
             # if u in instance.keys() and v in instance.keys():
-            query += "// Removing pattern matched edges '{}->{}' of the lhs \n".format(
-                rule.p_lhs[u], rule.p_lhs[v])
+            query_parts.append("// Removing pattern matched edges '{}->{}' of the lhs \n".format(
+                rule.p_lhs[u], rule.p_lhs[v]))
             edge_var = "{}_{}".format(
                 str(lhs_vars[rule.p_lhs[u]]),
                 str(lhs_vars[rule.p_lhs[v]]))
-            query += remove_edge(edge_var)
-            query += "\n"
+            query_parts.append(remove_edge(edge_var))
+            query_parts.append("\n")
             carry_variables.remove(edge_var)
 
     if len(rule.removed_nodes()) > 0 or len(rule.removed_edges()) > 0:
-        query += generic.with_vars(carry_variables)
+        query_parts.append(generic.with_vars(carry_variables))
 
     # Rename untouched vars as they are in P
     vars_to_rename = {}
     for n in rule.lhs.nodes():
         if n not in rule.removed_nodes():
             if n not in rule.cloned_nodes().keys():
-                new_var_name = p_vars[generic.keys_by_value(rule.p_lhs, n)[0]]
+                new_var_name = p_vars[keys_by_value(rule.p_lhs, n)[0]]
                 vars_to_rename[lhs_vars[n]] = new_var_name
                 carry_variables.remove(lhs_vars[n])
             elif n in fixed_nodes.keys():
@@ -1603,21 +1604,21 @@ def rule_to_cypher(rule, instance, node_label="node",
                 carry_variables.remove(lhs_vars[n])
 
     if len(vars_to_rename) > 0:
-        query += "\n// Renaming vars to correspond to the vars of P\n"
+        query_parts.append("\n// Renaming vars to correspond to the vars of P\n")
         if len(carry_variables) > 0:
-            query +=\
-                generic.with_vars(carry_variables) +\
+            query_parts.append(
+                generic.with_vars(carry_variables) +
                 ", " + ", ".join(
                     "{} as {}".format(k, v)
-                    for k, v in vars_to_rename.items()) +\
-                " "
+                    for k, v in vars_to_rename.items()) +
+                " ")
         else:
-            query +=\
+            query_parts.append(
                 "WITH " + ", ".join(
                     "{} as {}".format(k, v)
-                    for k, v in vars_to_rename.items()) +\
-                " "
-        query += "\n\n"
+                    for k, v in vars_to_rename.items()) +
+                " ")
+        query_parts.append("\n\n")
     for k, v in vars_to_rename.items():
         carry_variables.add(v)
 
@@ -1635,9 +1636,9 @@ def rule_to_cypher(rule, instance, node_label="node",
                 p_vars[u] + "_" + p_vars[v]))
 
     if len(matches) > 0:
-        query += "// Removing edges not bound to vars by matching (edges from/to clones)\n"
+        query_parts.append("// Removing edges not bound to vars by matching (edges from/to clones)\n")
         for edge, var in matches:
-            query += (
+            query_parts.append(
                 "// Removing '{}->{}' in P \n".format(u, v) +
                 "OPTIONAL MATCH {}\n".format(edge) +
                 "DELETE {}\n".format(var) +
@@ -1651,34 +1652,34 @@ def rule_to_cypher(rule, instance, node_label="node",
            (p_u, p_v) not in rule.removed_edges():
             # lhs_u = rule.p_lhs[p_u]
             # lhs_v = rule.p_lhs[p_v]
-            query += "MERGE ({})-[{}:{}]->({})\n".format(
+            query_parts.append("MERGE ({})-[{}:{}]->({})\n".format(
                 p_vars[p_u], p_vars[p_u] + "_" + p_vars[p_v],
-                edge_label, p_vars[p_v])
+                edge_label, p_vars[p_v]))
 
     # Generate node attrs removal subquery
     for node, attrs in rule.removed_node_attrs().items():
-        query += "// Removing properties from node '{}' of P \n".format(node)
-        query += remove_attributes(p_vars[node], attrs)
-        query += "\n\n"
+        query_parts.append("// Removing properties from node '{}' of P \n".format(node))
+        query_parts.append(remove_attributes(p_vars[node], attrs))
+        query_parts.append("\n\n")
 
     # Generate edge attrs removal subquery
     for e, attrs in rule.removed_edge_attrs().items():
         u = e[0]
         v = e[1]
-        query += "// Removing properties from edge {}->{} of P \n".format(
-            u, v)
-        query += generic.with_vars(carry_variables)
-        query += "MATCH ({})-[{}:edge]->({})\n".format(
-            p_vars[u], p_vars[u] + "_" + p_vars[v], p_vars[v])
+        query_parts.append("// Removing properties from edge {}->{} of P \n".format(
+            u, v))
+        query_parts.append(generic.with_vars(carry_variables))
+        query_parts.append("MATCH ({})-[{}:edge]->({})\n".format(
+            p_vars[u], p_vars[u] + "_" + p_vars[v], p_vars[v]))
         carry_variables.add(p_vars[u] + "_" + p_vars[v])
-        query += remove_attributes(p_vars[u] + "_" + p_vars[v], attrs)
-        query += "\n\n"
+        query_parts.append(remove_attributes(p_vars[u] + "_" + p_vars[v], attrs))
+        query_parts.append("\n\n")
 
     # Generate merging subquery
     for rhs_key, p_nodes in rule.merged_nodes().items():
-        query +=\
-            "// Merging nodes '{}' of the preserved part ".format(p_nodes) +\
-            "into '{}' \n".format(rhs_key)
+        query_parts.append(
+            "// Merging nodes '{}' of the preserved part ".format(p_nodes) +
+            "into '{}' \n".format(rhs_key))
         merged_id = "_".join(instance[rule.p_lhs[p_n]]for p_n in p_nodes)
         q, carry_variables = merging_query1(
             original_vars=[p_vars[n] for n in p_nodes],
@@ -1690,12 +1691,12 @@ def rule_to_cypher(rule, instance, node_label="node",
             merge_typing=True,
             carry_vars=carry_variables,
             ignore_naming=True)
-        query += q
-        query += "\n\n"
+        query_parts.append(q)
+        query_parts.append("\n\n")
 
     # Generate nodes addition subquery
     for rhs_node in rule.added_nodes():
-        query += "// Adding node '{}' from the rhs \n".format(rhs_node)
+        query_parts.append("// Adding node '{}' from the rhs \n".format(rhs_node))
         if generate_var_ids:
             new_node_id_var = generic.generate_var_name()
         else:
@@ -1705,8 +1706,8 @@ def rule_to_cypher(rule, instance, node_label="node",
             node_label=node_label,
             carry_vars=carry_variables,
             ignore_naming=True)
-        query += q
-        query += "\n\n"
+        query_parts.append(q)
+        query_parts.append("\n\n")
 
     # Rename untouched vars as they are in rhs
     vars_to_rename = {}
@@ -1719,31 +1720,31 @@ def rule_to_cypher(rule, instance, node_label="node",
                 carry_variables.remove(prev_var_name)
 
     if len(vars_to_rename) > 0:
-        query += "// Renaming vars to correspond to the vars of rhs\n"
+        query_parts.append("// Renaming vars to correspond to the vars of rhs\n")
         if len(carry_variables) > 0:
-            query +=\
-                generic.with_vars(carry_variables) +\
+            query_parts.append(
+                generic.with_vars(carry_variables) +
                 ", " + ", ".join(
                     "{} as {}".format(k, v)
-                    for k, v in vars_to_rename.items()) +\
-                " "
+                    for k, v in vars_to_rename.items()) +
+                " ")
         else:
-            query +=\
+            query_parts.append(
                 "WITH " + ", ".join(
                     "{} as {}".format(k, v)
-                    for k, v in vars_to_rename.items()) +\
-                " "
-        query += "\n\n"
+                    for k, v in vars_to_rename.items()) +
+                " ")
+        query_parts.append("\n\n")
 
     for k, v in vars_to_rename.items():
         carry_variables.add(v)
 
     # Generate node attrs addition subquery
     for rhs_node, attrs in rule.added_node_attrs().items():
-        query += "// Adding properties to the node " +\
-            "'{}' from the rhs \n".format(rhs_node)
-        query += add_attributes(rhs_vars[rhs_node], attrs)
-        query += "\n\n"
+        query_parts.append("// Adding properties to the node " +\
+            "'{}' from the rhs \n".format(rhs_node))
+        query_parts.append(add_attributes(rhs_vars[rhs_node], attrs))
+        query_parts.append("\n\n")
 
     # Generate edges addition subquery
     # query += (
@@ -1751,38 +1752,39 @@ def rule_to_cypher(rule, instance, node_label="node",
     #     ", ".join(carry_variables) + "\n"
     # )
     for u, v in rule.added_edges():
-        query += "// Adding edge '{}->{}' from the rhs \n".format(u, v)
+        query_parts.append("// Adding edge '{}->{}' from the rhs \n".format(u, v))
         new_edge_var = rhs_vars[u] + "_" + rhs_vars[v]
-        query += add_edge(
+        query_parts.append(add_edge(
             edge_var=new_edge_var,
             source_var=rhs_vars[u],
             target_var=rhs_vars[v],
             edge_label=edge_label,
-            attrs=rule.rhs.adj[u][v])
+            attrs=rule.rhs.get_edge(u, v)))
         if (u, v) in rule.added_edge_attrs().keys():
             carry_variables.add(new_edge_var)
-        query += "\n\n"
+        query_parts.append("\n\n")
 
     # Generate edge attrs addition subquery
     for e, attrs in rule.added_edge_attrs().items():
         u = e[0]
         v = e[1]
-        query += "// Adding properties to an edge " +\
-            "'{}'->'{}' from the rhs \n".format(u, v)
-        query += generic.with_vars(carry_variables) + '\n'
+        query_parts.append("// Adding properties to an edge " +\
+            "'{}'->'{}' from the rhs \n".format(u, v))
+        query_parts.append(generic.with_vars(carry_variables) + '\n')
 
         edge_var = rhs_vars[u] + "_" + rhs_vars[v]
         if (u, v) not in rule.added_edges():
-            query += "MATCH ({})-[{}:edge]->({})\n".format(
-                rhs_vars[u], edge_var, rhs_vars[v])
+            query_parts.append("MATCH ({})-[{}:edge]->({})\n".format(
+                rhs_vars[u], edge_var, rhs_vars[v]))
             carry_variables.add(edge_var)
 
-        query += add_attributes(edge_var, attrs)
-        query += generic.with_vars(carry_variables)
-        query += "\n\n"
+        query_parts.append(add_attributes(edge_var, attrs))
+        query_parts.append(generic.with_vars(carry_variables))
+        query_parts.append("\n\n")
 
-    query += "// Return statement \n"
-    query += generic.return_vars(carry_variables)
+    query_parts.append("// Return statement \n")
+    query_parts.append(generic.return_vars(carry_variables))
+    query = "".join(query_parts)
 
     # Dictionary defining a mapping from the generated
     # unique variable names to the names of nodes of the rhs
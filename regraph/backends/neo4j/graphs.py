@@ -5,6 +5,7 @@ graphs stored in an instance of the Neo4j database.
 """
 import os
 import json
+import threading
 import warnings
 
 from neo4j import GraphDatabase
@@ -34,9 +35,11 @@ class Neo4jGraph(Graph):
     _driver :  neo4j.GraphDatabase
         Driver providing connection to a Neo4j database
     _node_label : str
-        Label of nodes inducing the manipulated subgraph.
+        Label of nodes inducing the manipulated subgraph
+        (quoted, as it appears in the queries).
     _edge_label : str
-        Type of relations used in the manipulated subgraph.
+        Type of relations used in the manipulated subgraph
+        (quoted, as it appears in the queries).
     """
 
     def __init__(self, driver=None, uri=None,
@@ -76,8 +79,11 @@ class Neo4jGraph(Graph):
         else:
             self._driver = driver
 
-        self._node_label = node_label
-        self._edge_label = edge_label
+        # Labels are quoted once, so that they are safely
+        # interpolated in all the generated queries
+        self._node_label = generic.quote_label(node_label)
+        self._edge_label = generic.quote_label(edge_label)
+        self._local = threading.local()
         self.unique_node_ids = unique_node_ids
         if unique_node_ids:
             try:
@@ -86,15 +92,34 @@ class Neo4jGraph(Graph):
                 warnings.warn(
                     "Failed to create id uniqueness constraint")
 
-    def _execute(self, query):
-        """Execute a Cypher query."""
-        with self._driver.session() as session:
-            if len(query) > 0:
-                result = session.run(query)
-                return result
+    def _execute(self, query, **params):
+        """Execute a Cypher query.
+
+        Keyword arguments are passed to the query as parameters.
+        The query is run in the long-lived session of the current
+        thread, the first record of its result is fetched before
+        returning (the remaining ones are buffered by the driver
+        when the next query is run in the session).
+        """
+        if len(query) > 0:
+            result = self._get_session().run(query, **params)
+            result.peek()
+            return result
+
+    def _get_session(self):
+        """Get the session of the current thread (open it if needed)."""
+        session = getattr(self._local, "session", None)
+        if session is None or session.closed():
+            session = self._driver.session()
+            self._local.session = session
+        return session
 
     def _close(self):
         """Close connection to the database."""
+        session = getattr(self._local, "session", None)
+        if session is not None:
+            session.close()
+            self._local.session = None
         self._driver.close()
 
     def _clear(self):
@@ -141,7 +166,7 @@ class Neo4jGraph(Graph):
         """
         try:
             query = "DROP " + generic.constraint_query('n', self._node_label, prop)
-            result = self.execute(query)
+            result = self._execute(query)
             return result
         except:
             warnings.warn("Failed to drop constraint")
@@ -543,12 +568,12 @@ class Neo4jGraph(Graph):
     def nodes_disconnected_from(self, node_id):
         """Find nodes disconnected from the input node."""
         query = (
-            "MATCH (n:{} {{id: '{}'}}), (m:{})\n".format(
-                self._node_label, node_id, self._node_label) +
+            "MATCH (n:{} {{id: $id}}), (m:{})\n".format(
+                self._node_label, self._node_label) +
             "WHERE NOT (n)-[:{}*1..]-(m) AND n.id <> m.id\n".format(
                 self._edge_label) +
             "RETURN collect(m.id) as disconnected_nodes"
         )
-        res = self._execute(query)
+        res = self._execute(query, id=str(node_id))
         for record in res:
             return record["disconnected_nodes"]
@@ -8,10 +8,13 @@ graph hierarchies stored in an instance of the Neo4j database:
 """
 import os
 import json
+import threading
 import warnings
 
+from collections import OrderedDict
+
 from neo4j import GraphDatabase
-from neo4j.exceptions import ConstraintError
+from neo4j.exceptions import ConstraintError, ClientError
 
 from regraph.rules import Rule
 from regraph.backends.networkx.graphs import NXGraph
@@ -23,34 +26,33 @@ from regraph.exceptions import (HierarchyError,
 from regraph.hierarchies import Hierarchy
 from regraph.backends.neo4j.graphs import Neo4jGraph
 from .cypher_utils.generic import (constraint_query,
+                                   quote_label,
                                    get_nodes,
                                    get_edges,
                                    clear_graph,
-                                   successors_query,
-                                   predecessors_query,
-                                   get_edge_attrs,
                                    properties_to_attributes,
-                                   get_node_attrs,
-                                   set_attributes,
+                                   generate_attributes_json,
+                                   create_nodes_from_list,
+                                   create_edges_from_list,
                                    match_nodes,
                                    with_vars,
-                                   match_node,
-                                   shortest_path_query,
                                    match_edge,
                                    )
 from .cypher_utils.propagation import (set_intergraph_edge,
+                                       set_intergraph_edges,
+                                       TMP_TYPING_ATTRS,
                                        check_homomorphism,
                                        check_consistency,
                                        get_typing,
                                        get_relation)
 from .cypher_utils.rewriting import (add_edge,
-                                     remove_nodes,
                                      remove_edge)
 from regraph.utils import (normalize_attrs,
                            attrs_from_json,
                            normalize_relation,
                            valid_attributes,
                            keys_by_value)
+from regraph.category_utils import compose
 
 
 class Neo4jHierarchy(Hierarchy):
@@ -62,6 +64,11 @@ class Neo4jHierarchy(Hierarchy):
 
     """
 
+    # Maximal number of graph objects kept by `_access_graph`
+    _graph_cache_size = 128
+    # Maximal number of rows unwound by a single write query
+    _write_batch_size = 10000
+
     # Implementation of abstract methods
 
     def graphs(self, data=False):
@@ -114,25 +121,23 @@ class Neo4jHierarchy(Hierarchy):
 
     def successors(self, node_id):
         """Return the set of successors."""
-        query = successors_query(var_name='g',
-                                 node_id=node_id,
-                                 node_label=self._graph_label,
-                                 edge_label=self._typing_label)
-        succ = self.execute(query).value()
-        if succ[0] is None:
-            succ = []
-        return succ
+        query = (
+            "OPTIONAL MATCH (g:{} {{id: $id}})-[:{}]->(suc:{})\n".format(
+                self._graph_label, self._typing_label, self._graph_label) +
+            "RETURN suc.id as suc"
+        )
+        result = self.execute(query, id=str(node_id))
+        return [record[0] for record in result if record[0] is not None]
 
     def predecessors(self, node_id):
         """Return the set of predecessors."""
-        query = predecessors_query(var_name='g',
-                                   node_id=node_id,
-                                   node_label=self._graph_label,
-                                   edge_label=self._typing_label)
-        preds = self.execute(query).value()
-        if preds[0] is None:
-            preds = []
-        return preds
+        query = (
+            "OPTIONAL MATCH (pred:{})-[:{}]->(g:{} {{id: $id}})\n".format(
+                self._graph_label, self._typing_label, self._graph_label) +
+            "RETURN pred.id as pred"
+        )
+        result = self.execute(query, id=str(node_id))
+        return [record[0] for record in result if record[0] is not None]
 
     def get_graph(self, graph_id):
         """Get a graph object associated to the node 'graph_id'."""
@@ -140,30 +145,19 @@ class Neo4jHierarchy(Hierarchy):
 
     def get_typing(self, source_id, target_id):
         """Get a typing dict associated to the edge 'source_id->target_id'."""
-        query = get_typing(source_id, target_id, "typing")
+        query = get_typing(
+            quote_label(source_id), quote_label(target_id), "typing")
         result = self.execute(query)
-        typing = {}
         source_nodes = self.get_graph(source_id).nodes()
         target_nodes = self.get_graph(target_id).nodes()
-        for record in result:
-            node_id = record["node"]
-            if node_id not in source_nodes:
-                try:
-                    node_id = int(node_id)
-                except:
-                    pass
-            type_id = record["type"]
-            if type_id not in target_nodes:
-                try:
-                    type_id = int(type_id)
-                except:
-                    pass
-            typing[node_id] = type_id
-        return typing
+        return self._typing_from_pairs(
+            [(record["node"], record["type"]) for record in result],
+            source_nodes, target_nodes)
 
     def get_relation(self, left_id, right_id):
         """Get a relation dict associated to the rel 'left_id->target_id'."""
-        query = get_relation(left_id, right_id, "relation")
+        query = get_relation(
+            quote_label(left_id), quote_label(right_id), "relation")
         result = self.execute(query)
         relation = {}
         for record in result:
@@ -181,10 +175,11 @@ class Neo4jHierarchy(Hierarchy):
         graph_id : hashable
             Id of the graph
         """
-        query = get_node_attrs(
-            graph_id, self._graph_label,
-            "attributes")
-        result = self.execute(query)
+        query = (
+            "MATCH (n:{} {{ id: $id }})\n".format(self._graph_label) +
+            "RETURN properties(n) as attributes\n"
+        )
+        result = self.execute(query, id=str(graph_id))
         return properties_to_attributes(
             result, "attributes")
 
@@ -196,7 +191,8 @@ class Neo4jHierarchy(Hierarchy):
         graph_id : hashable
             Id of the graph
         """
-        skeleton = self._access_graph(self._graph_label)
+        skeleton = self._access_graph(
+            self._graph_label, unique_node_ids=False)
         skeleton.set_node_attrs(graph_id, attrs, update)
 
     def get_typing_attrs(self, source_id, target_id):
@@ -209,10 +205,9 @@ class Neo4jHierarchy(Hierarchy):
         target : hashable
             Id of the target graph
         """
-        query = get_edge_attrs(
-            source_id, target_id, self._typing_label,
-            "attributes")
-        result = self.execute(query)
+        query = self._skeleton_edge_attrs_query(self._typing_label)
+        result = self.execute(
+            query, source=str(source_id), target=str(target_id))
         return properties_to_attributes(result, "attributes")
 
     def set_typing_attrs(self, source, target, attrs):
@@ -225,7 +220,8 @@ class Neo4jHierarchy(Hierarchy):
         target : hashable
             Id of the target graph
         """
-        skeleton = self._access_graph(self._graph_label, self._typing_label)
+        skeleton = self._access_graph(
+            self._graph_label, self._typing_label, unique_node_ids=False)
         skeleton.set_edge_attrs(source, target, attrs)
 
     def get_relation_attrs(self, left_id, right_id):
@@ -238,10 +234,9 @@ class Neo4jHierarchy(Hierarchy):
         right : hashable
             Id of the right graph
         """
-        query = get_edge_attrs(
-            left_id, right_id, self._relation_label,
-            "attributes")
-        result = self.execute(query)
+        query = self._skeleton_edge_attrs_query(self._relation_label)
+        result = self.execute(
+            query, source=str(left_id), target=str(right_id))
         return properties_to_attributes(result, "attributes")
 
     def set_relation_attrs(self, left, right, attrs):
@@ -254,7 +249,8 @@ class Neo4jHierarchy(Hierarchy):
         right : hashable
             Id of the right graph
         """
-        skeleton = self._access_graph(self._graph_label, self._relation_label)
+        skeleton = self._access_graph(
+            self._graph_label, self._relation_label, unique_node_ids=False)
         skeleton.set_edge_attrs(left, right, attrs)
 
     def set_node_relation(self, left_graph, right_graph, left_node,
@@ -265,8 +261,8 @@ class Neo4jHierarchy(Hierarchy):
         ----------
         """
         query = set_intergraph_edge(
-            left_graph, right_graph, left_node, right_node,
-            "relation")
+            quote_label(left_graph), quote_label(right_graph),
+            left_node, right_node, "relation")
         self.execute(query)
 
     def add_graph(self, graph_id, graph, attrs=None):
@@ -299,29 +295,71 @@ class Neo4jHierarchy(Hierarchy):
         graph_attrs : dict, optional
             Dictionary containing attributes of the new node
         """
+        if attrs is None:
+            attrs = dict()
+        normalize_attrs(attrs)
         try:
-            # Create a node in the hierarchy
-            query = "CREATE ({}:{} {{ id : '{}' }}) \n".format(
-                'new_graph',
-                self._graph_label,
-                graph_id)
-            if attrs is not None:
-                normalize_attrs(attrs)
-                query += set_attributes(
-                    var_name='new_graph',
-                    attrs=attrs)
-            self.execute(query)
+            # Create a node in the hierarchy (with its attributes)
+            query = (
+                "CREATE ({}:{} {{ id : $id }}) \n".format(
+                    'new_graph', self._graph_label) +
+                "SET new_graph += $attrs\n"
+            )
+            self.execute(
+                query, id=str(graph_id),
+                attrs=generate_attributes_json(attrs))
         except(ConstraintError):
             raise HierarchyError(
                 "The graph '{}' is already in the database.".format(graph_id))
-        g = Neo4jGraph(
-            driver=self._driver,
-            node_label=graph_id,
-            unique_node_ids=True)
+        # Creates the uniqueness constraint on the node ids
+        self._access_graph(graph_id)
+
         if node_list is not None:
-            g.add_nodes_from(node_list)
+            nodes = []
+            for n in node_list:
+                if type(n) != str:
+                    try:
+                        node_id, node_attrs = n
+                    except (TypeError, ValueError):
+                        node_id, node_attrs = n, dict()
+                else:
+                    node_id, node_attrs = n, dict()
+                if node_attrs is None:
+                    node_attrs = dict()
+                normalize_attrs(node_attrs)
+                nodes.append({
+                    "id": str(node_id),
+                    "attrs": generate_attributes_json(node_attrs)
+                })
+            if len(nodes) > 0:
+                self._execute_in_batches(
+                    create_nodes_from_list(quote_label(graph_id)),
+                    "nodes", nodes)
         if edge_list is not None:
-            g.add_edges_from(edge_list)
+            edges = []
+            for e in edge_list:
+                if len(e) == 2:
+                    edge_attrs = dict()
+                elif len(e) == 3:
+                    edge_attrs = e[2]
+                    if edge_attrs is None:
+                        edge_attrs = dict()
+                else:
+                    raise ReGraphError(
+                        "Was expecting 2 or 3 elements per tuple, got %s." %
+                        str(len(e))
+                    )
+                normalize_attrs(edge_attrs)
+                edges.append({
+                    "source": str(e[0]),
+                    "target": str(e[1]),
+                    "attrs": generate_attributes_json(edge_attrs)
+                })
+            if len(edges) > 0:
+                self._execute_in_batches(
+                    create_edges_from_list(
+                        quote_label(graph_id), self._graph_edge_label),
+                    "edges", edges)
 
     def add_empty_graph(self, graph_id, attrs=None):
         """"Add a new empty graph to the hierarchy.
@@ -368,74 +406,47 @@ class Neo4jHierarchy(Hierarchy):
             the target given by `mapping` is not a valid homomorphism.
 
         """
-        query = ""
-        tmp_attrs = {'tmp': {'true'}}
-        normalize_attrs(tmp_attrs)
-
-        if len(mapping) > 0:
-            with self._driver.session() as session:
-                tx = session.begin_transaction()
-                for u, v in mapping.items():
-                    query = (
-                        set_intergraph_edge(
-                            source, target,
-                            u, v, "typing",
-                            attrs=tmp_attrs))
-                    tx.run(query)
-                tx.commit()
-
-        valid_typing = True
-        paths_commute = True
-        if check:
-            # We first check that the homorphism is valid
-            try:
-                with self._driver.session() as session:
-                    tx = session.begin_transaction()
-                    valid_typing = check_homomorphism(tx, source, target)
-                    tx.commit()
-            except InvalidHomomorphism as homomorphism_error:
-                valid_typing = False
-                del_query = (
-                    "MATCH (:{})-[t:typing]-(:{})\n".format(
-                        source, target) +
-                    "DELETE t\n"
-                )
-                self.execute(del_query)
-                raise homomorphism_error
-            # We then check that the new typing preserv consistency
-            try:
-                with self._driver.session() as session:
-                    tx = session.begin_transaction()
-                    paths_commute = check_consistency(tx, source, target)
-                    tx.commit()
-            except InvalidHomomorphism as consistency_error:
-                paths_commute = False
-                del_query = (
+        # The typing edges are created, checked and attached to the
+        # skeleton within a single transaction: if the check fails,
+        # the transaction is rolled back and no typing edge remains
+        with self._get_session().begin_transaction() as tx:
+            if len(mapping) > 0:
+                query = set_intergraph_edges(
+                    quote_label(source), quote_label(target), "typing",
+                    attrs_repr=TMP_TYPING_ATTRS)
+                pairs = [
+                    {"source": str(u), "target": str(v)}
+                    for u, v in mapping.items()
+                ]
+                tx.run(query, pairs=pairs)
+
+            valid_typing = True
+            paths_commute = True
+            if check:
+                valid_typing = check_homomorphism(
+                    tx, quote_label(source), quote_label(target))
+                paths_commute = check_consistency(
+                    tx, quote_label(source), quote_label(target))
+
+            if valid_typing and paths_commute:
+                skeleton_query = (
+                    match_nodes(
+                        var_id_dict={'g_src': source, 'g_tar': target},
+                        node_label=self._graph_label,
+                        parameterized=True) +
+                    add_edge(
+                        edge_var='new_hierarchy_edge',
+                        source_var='g_src',
+                        target_var='g_tar',
+                        edge_label=self._typing_label,
+                        attrs=attrs) +
+                    with_vars(["new_hierarchy_edge"]) +
                     "MATCH (:{})-[t:typing]-(:{})\n".format(
-                        source, target) +
-                    "DELETE t\n"
-                )
-                self.execute(del_query)
-                raise consistency_error
-
-        if valid_typing and paths_commute:
-            skeleton_query = (
-                match_nodes(
-                    var_id_dict={'g_src': source, 'g_tar': target},
-                    node_label=self._graph_label) +
-                add_edge(
-                    edge_var='new_hierarchy_edge',
-                    source_var='g_src',
-                    target_var='g_tar',
-                    edge_label=self._typing_label,
-                    attrs=attrs) +
-                with_vars(["new_hierarchy_edge"]) +
-                "MATCH (:{})-[t:typing]-(:{})\n".format(
-                    source, target) +
-                "REMOVE t.tmp\n"
+                        quote_label(source), quote_label(target)) +
+                    "REMOVE t.tmp\n"
 
-            )
-            self.execute(skeleton_query)
+                )
+                tx.run(skeleton_query, g_src=str(source), g_tar=str(target))
         # return result
 
     def add_relation(self, left, right, relation, attrs=None):
@@ -480,18 +491,23 @@ class Neo4jHierarchy(Hierarchy):
         if attrs is not None:
             normalize_attrs(attrs)
 
-        for key, values in new_rel.items():
-            for v in values:
-                query = (
-                    "MATCH (u:{} {{id: '{}'}}), (v:{} {{id: '{}'}})\n".format(
-                        left, key, right, v) +
-                    add_edge(
-                        edge_var="rel",
-                        source_var="u",
-                        target_var="v",
-                        edge_label="relation")
-                )
-                self.execute(query)
+        pairs = [
+            {"source": str(key), "target": str(v)}
+            for key, values in new_rel.items()
+            for v in values
+        ]
+        if len(pairs) > 0:
+            query = (
+                "UNWIND $pairs AS pair\n" +
+                "MATCH (u:{} {{id: pair.source}}), (v:{} {{id: pair.target}})\n".format(
+                    quote_label(left), quote_label(right)) +
+                add_edge(
+                    edge_var="rel",
+                    source_var="u",
+                    target_var="v",
+                    edge_label="relation")
+            )
+            self._execute_in_batches(query, "pairs", pairs)
 
         # query = ""
         # rel_creation_queries = []
@@ -525,7 +541,8 @@ class Neo4jHierarchy(Hierarchy):
         skeleton_query = (
             match_nodes(
                 var_id_dict={'g_left': left, 'g_right': right},
-                node_label=self._graph_label) +
+                node_label=self._graph_label,
+                parameterized=True) +
             add_edge(
                 edge_var='new_hierarchy_edge',
                 source_var='g_left',
@@ -533,7 +550,8 @@ class Neo4jHierarchy(Hierarchy):
                 edge_label=self._relation_label,
                 attrs=attrs)
         )
-        skeleton_addition_result = self.execute(skeleton_query)
+        skeleton_addition_result = self.execute(
+            skeleton_query, g_left=str(left), g_right=str(right))
         return (None, skeleton_addition_result)
 
     def remove_graph(self, graph_id, reconnect=False):
@@ -562,135 +580,152 @@ class Neo4jHierarchy(Hierarchy):
         HierarchyError
             If graph with `node_id` is not defined in the hierarchy
         """
-        g = self._access_graph(graph_id)
+        g = self._access_graph(graph_id, unique_node_ids=False)
 
-        if reconnect:
-            query = (
-                "MATCH (n:{})".format(graph_id) +
-                "OPTIONAL MATCH (pred)-[:typing]->(n)-[:typing]->(suc)\n" +
-                "WITH pred, suc WHERE pred IS NOT NULL\n" +
-                add_edge(
-                    edge_var='reconnect_typing',
-                    source_var='pred',
-                    target_var='suc',
-                    edge_label="typing")
-            )
-            self.execute(query)
-        # Clear the graph and drop the constraint on the ids
-        g._drop_constraint('id')
-        g._clear()
+        # The data and the skeleton are updated by a single query:
+        # reconnect the skeleton (if True), reconnect the typing of the
+        # data (if True), clear the graph and remove its skeleton node
+        query = (
+            "MATCH (graph_to_rm:{} {{ id : $id }})\n".format(
+                self._graph_label) +
+            "OPTIONAL MATCH (pred:{})-[:{}]->(graph_to_rm)-[:{}]->(suc:{})\n".format(
+                self._graph_label, self._typing_label,
+                self._typing_label, self._graph_label) +
+            "FOREACH(dummy IN CASE WHEN $reconnect AND pred IS NOT NULL " +
+            "THEN [1] ELSE [] END |\n" +
+            "\tMERGE (pred)-[:{}]->(suc))\n".format(self._typing_label) +
+            "WITH DISTINCT graph_to_rm\n" +
+            "OPTIONAL MATCH (pred_node)-[:{}]->(:{})-[:{}]->(suc_node)\n".format(
+                self._graph_typing_label, quote_label(graph_id),
+                self._graph_typing_label) +
+            "FOREACH(dummy IN CASE WHEN $reconnect AND pred_node IS NOT NULL " +
+            "THEN [1] ELSE [] END |\n" +
+            "\tMERGE (pred_node)-[:{}]->(suc_node))\n".format(
+                self._graph_typing_label) +
+            "WITH DISTINCT graph_to_rm\n" +
+            "OPTIONAL MATCH (n:{})\n".format(quote_label(graph_id)) +
+            "DETACH DELETE n\n" +
+            "WITH DISTINCT graph_to_rm\n" +
+            "DETACH DELETE graph_to_rm\n"
+        )
+        self.execute(query, id=str(graph_id), reconnect=reconnect)
 
-        # Remove the graph (and reconnect if True)
-        if reconnect:
-            query = (
-                match_node(
-                    var_name="graph_to_rm",
-                    node_id=graph_id,
-                    node_label=self._graph_label) +
-                "OPTIONAL MATCH (pred)-[:{}]->(n)-[:{}]->(suc)\n".format(
-                    self._typing_label, self._typing_label) +
-                "WITH pred, suc WHERE pred IS NOT NULL\n" +
-                add_edge(
-                    edge_var='reconnect_typing',
-                    source_var='pred',
-                    target_var='suc',
-                    edge_label="typing")
-            )
-            self.execute(query)
-        query = match_node(var_name="graph_to_rm",
-                           node_id=graph_id,
-                           node_label=self._graph_label)
-        query += remove_nodes(["graph_to_rm"])
-        self.execute(query)
+        # Drop the constraint on the ids (schema updates cannot
+        # be performed in the same transaction as data updates)
+        g._drop_constraint('id')
+        self._invalidate_graph_cache(graph_id)
 
     def remove_typing(self, s, t):
         """Remove a typing from the hierarchy."""
         # Clean-up the represenation of the homomorphism
-        query = (
+        query1 = (
             "MATCH (:{})-[r:{}]->(:{})\n".format(
-                s, self._graph_typing_label, t) +
+                quote_label(s), self._graph_typing_label, quote_label(t)) +
             "DELETE r\n"
         )
-        self.execute(query)
         # Remove the corresponding edge from the skeleton
-        query = match_edge(
+        query2 = match_edge(
             "source", "target", s, t, "e",
             self._graph_label, self._graph_label,
-            edge_label=self._typing_label)
-        query += remove_edge("e")
-        self.execute(query)
+            edge_label=self._typing_label,
+            parameterized=True)
+        query2 += remove_edge("e")
+        self._execute_in_transaction(
+            [query1, query2], source=str(s), target=str(t))
 
     def remove_relation(self, left, right):
         """Remove a relation from the hierarchy."""
-        query = (
+        query1 = (
             "MATCH (:{})-[r:{}]-(:{})\n".format(
-                left, self._graph_relation_label, right) +
+                quote_label(left), self._graph_relation_label,
+                quote_label(right)) +
             "DELETE r\n"
         )
-        self.execute(query)
         # Remove the corresponding edge from the skeleton
-        query = match_edge(
+        query2 = match_edge(
             "left", "right", left, right, "e",
             self._graph_label, self._graph_label,
-            edge_label=self._relation_label)
-        query += remove_edge("e")
-        self.execute(query)
+            edge_label=self._relation_label,
+            parameterized=True)
+        query2 += remove_edge("e")
+        self._execute_in_transaction(
+            [query1, query2], left=str(left), right=str(right))
 
     def bfs_tree(self, graph, reverse=False):
-        """BFS tree from the graph to all other reachable graphs."""
-        bfs_result = []
+        """BFS tree from the graph to all other reachable graphs.
+
+        The whole traversal is performed within a single session,
+        every graph of the hierarchy is visited at most once. The
+        adjacent graphs of all the graphs from the same level of the
+        tree are retrieved with a single query.
+        """
         if reverse:
-            current_level = self.predecessors(graph)
+            pattern = "(adj:{})-[:{}]->(g:{} {{id: graph_id}})".format(
+                self._graph_label, self._typing_label, self._graph_label)
         else:
-            current_level = self.successors(graph)
-        bfs_result += current_level
-
-        while len(current_level) > 0:
-            next_level = []
-            for g in current_level:
-                if reverse:
-                    next_level += [
-                        p for p in self.predecessors(g)
-                        if p not in set(bfs_result)]
-                else:
-                    next_level += [
-                        s for s in self.successors(g)
-                        if s not in set(bfs_result)
-                    ]
-            current_level = next_level
-            bfs_result += next_level
+            pattern = "(g:{} {{id: graph_id}})-[:{}]->(adj:{})".format(
+                self._graph_label, self._typing_label, self._graph_label)
+        query = (
+            "UNWIND $ids AS graph_id\n" +
+            "MATCH {}\n".format(pattern) +
+            "RETURN graph_id, adj.id as adj"
+        )
+
+        bfs_result = []
+        visited = set()
+        with self._driver.session() as session:
+            current_level = [graph]
+            while len(current_level) > 0:
+                adjacent = dict()
+                for record in session.run(
+                        query, ids=[str(g) for g in current_level]):
+                    adjacent.setdefault(record["graph_id"], []).append(
+                        record["adj"])
+                next_level = []
+                for g in current_level:
+                    for adj in adjacent.get(str(g), []):
+                        if adj not in visited:
+                            visited.add(adj)
+                            next_level.append(adj)
+                current_level = next_level
+                bfs_result += next_level
 
         return bfs_result
 
     def shortest_path(self, source, target):
         """Shortest path from 'source' to 'target'."""
-        query = shortest_path_query(
-            source, target, self._graph_label, self._typing_label)
-        result = self.execute(query)
+        query = (
+            "MATCH path=shortestPath(" +
+            "(n:{} {{id: $source}})-[:{}*1..]->(m:{} {{id: $target}})) \n".format(
+                self._graph_label, self._typing_label, self._graph_label) +
+            "RETURN REDUCE(p=[], l in nodes(path) | p + [l.id]) as path"
+        )
+        result = self.execute(query, source=str(source), target=str(target))
         return result.single()["path"]
 
     def copy_graph(self, graph_id, new_graph_id, attach_graphs=[]):
         """Create a copy of a graph in a hierarchy."""
-        if new_graph_id in self.graphs():
+        if self._graph_exists(new_graph_id):
             raise HierarchyError(
                 "Graph with id '{}' already exists in the hierarchy".format(
                     new_graph_id))
         self.add_empty_graph(new_graph_id, attrs=self.get_graph_attrs(graph_id))
         copy_nodes_q = (
             "MATCH (n:{}) CREATE (n1:{}) SET n1=n\n ".format(
-                graph_id, new_graph_id)
+                quote_label(graph_id), quote_label(new_graph_id))
             # "SET n1.oldId = n.id, n1.id = toString(id(n1))\n"
         )
-        self.execute(copy_nodes_q)
         copy_edges_q = (
             "MATCH (n:{})-[r:{}]->(m:{}), (n1:{}), (m1:{}) \n".format(
-                graph_id, self._graph_edge_label, graph_id,
-                new_graph_id, new_graph_id) +
+                quote_label(graph_id), self._graph_edge_label,
+                quote_label(graph_id), quote_label(new_graph_id),
+                quote_label(new_graph_id)) +
             "WHERE n1.id=n.id AND m1.id=m.id \n" +
             "MERGE (n1)-[r1:{}]->(m1) SET r1=r\n".format(
                 self._graph_edge_label)
         )
-        self.execute(copy_edges_q)
+        # Nodes and edges are copied within one transaction
+        self._execute_in_transaction([copy_nodes_q, copy_edges_q])
         # copy all typings
         for g in attach_graphs:
             if g in self.successors(graph_id):
@@ -715,21 +750,24 @@ class Neo4jHierarchy(Hierarchy):
         new_graph_id : hashable
             New graph id to assign to this graph
         """
-        if new_graph_id in self.graphs():
+        if self._graph_exists(new_graph_id):
             raise ReGraphError(
                 "Cannot relabel '{}' to '{}', '{}' ".format(
                     graph_id, new_graph_id, new_graph_id) +
                 "already exists in the hierarchy")
         # Change labels of data nodes
         query = (
-            "MATCH (n:{})\n".format(graph_id) +
-            "SET n:{}\n".format(new_graph_id)
+            "MATCH (n:{})\n".format(quote_label(graph_id)) +
+            "SET n:{}\n".format(quote_label(new_graph_id))
         )
         self.execute(query)
 
         # Relabel node in the skeleton
-        skeleton = self._access_graph(self._graph_label)
+        skeleton = self._access_graph(
+            self._graph_label, unique_node_ids=False)
         skeleton.relabel_node(graph_id, new_graph_id)
+        self._invalidate_graph_cache(graph_id)
+        self._invalidate_graph_cache(new_graph_id)
 
     def relabel_graphs(self, mapping):
         """Relabel graphs in the hierarchy.
@@ -746,63 +784,79 @@ class Neo4jHierarchy(Hierarchy):
             If new id's do not define a set of distinct graph id's.
         """
         # Relabel nodes in the skeleton
-        skeleton = self._access_graph(self._graph_label)
+        skeleton = self._access_graph(
+            self._graph_label, unique_node_ids=False)
         skeleton.relabel_nodes(mapping)
 
         temp_names = {}
+        # The relabeling queries are run within one transaction
+        queries = []
         # Relabeling of the nodes: if at some point new ID conflicts
         # with already existing ID - assign temp ID
         for key, value in mapping.items():
             if key != value:
-                if value not in self.graphs():
+                if not self._graph_exists(value):
                     new_name = value
                 else:
                     new_name = self.generate_new_node_id(value)
                     temp_names[new_name] = value
-                query = (
-                    "MATCH (n:{})\n".format(key) +
-                    "SET n:{}\n".format(value)
+                queries.append(
+                    "MATCH (n:{})\n".format(quote_label(key)) +
+                    "SET n:{}\n".format(quote_label(value))
                 )
-                self.execute(query)
         # Relabeling the nodes with the temp ID to their new IDs
-        for key, value in temp_names:
+        for key, value in temp_names.items():
             if key != value:
-                query = (
-                    "MATCH (n:{})\n".format(key) +
-                    "SET n:{}\n".format(value)
+                queries.append(
+                    "MATCH (n:{})\n".format(quote_label(key)) +
+                    "SET n:{}\n".format(quote_label(value))
                 )
-                self.execute(query)
+        if len(queries) > 0:
+            self._execute_in_transaction(queries)
+        for key, value in mapping.items():
+            self._invalidate_graph_cache(key)
+            self._invalidate_graph_cache(value)
         return
 
-    def _update_mapping(self, source, target, mapping):
+    def _update_mapping(self, source, target, mapping, old_mapping=None):
         """Update the mapping dictionary from source to target."""
-        old_mapping = self.get_typing(source, target)
+        if old_mapping is None:
+            old_mapping = self.get_typing(source, target)
 
         typing_to_update = {
             k: mapping[k]
             for k, v in old_mapping.items()
             if k in mapping and mapping[k] != v
         }
-        for k, v in typing_to_update.items():
+        if len(typing_to_update) > 0:
             query = (
-                "MATCH (s:{} {{id: '{}'}})-[r:{}]->(t:{} {{id: '{}'}}), ".format(
-                    source, k, self._graph_typing_label, target, old_mapping[k]) +
-                "(new_t:{} {{id: '{}'}})\n".format(target, v) +
+                "UNWIND $pairs AS pair\n" +
+                "MATCH (s:{} {{id: pair.source}})-[r:{}]->(t:{} {{id: pair.old_target}}), ".format(
+                    quote_label(source), self._graph_typing_label,
+                    quote_label(target)) +
+                "(new_t:{} {{id: pair.target}})\n".format(quote_label(target)) +
                 "DELETE r\n" +
                 "MERGE (s)-[:{}]->(new_t)\n".format(self._graph_typing_label)
             )
-            self.execute(query)
+            self._execute_in_batches(query, "pairs", [
+                {
+                    "source": str(k),
+                    "old_target": str(old_mapping[k]),
+                    "target": str(v)
+                } for k, v in typing_to_update.items()
+            ])
 
         new_typing = {
             k: v for k, v in mapping.items() if k not in typing_to_update
         }
-        for k, v in new_typing.items():
-            query = (
-                "MATCH (s:{} {{id: '{}'}}), (new_t:{} {{id: '{}'}})\n".format(
-                    source, k, target, v) +
-                "MERGE (s)-[:{}]->(new_t)\n".format(self._graph_typing_label)
-            )
-            self.execute(query)
+        if len(new_typing) > 0:
+            query = set_intergraph_edges(
+                quote_label(source), quote_label(target),
+                self._graph_typing_label)
+            self._execute_in_batches(query, "pairs", [
+                {"source": str(k), "target": str(v)}
+                for k, v in new_typing.items()
+            ])
 
     def _update_relation(self, left, right, relation):
         """Update the relation dictionaries (left and right)."""
@@ -819,24 +873,56 @@ class Neo4jHierarchy(Hierarchy):
             else (k, v)
             for k, v in old_relation.items()
         ])
-        for k, vs in relations_to_add.items():
-            for v in vs:
-                query = (
-                    "MATCH (s:{} {{id: '{}'}}), (t:{} {{id: '{}'}}) \n".format(
-                        left, k, right, v) +
-                    "MERGE (s)-[:{}]->(t)\n".format(
-                        self._graph_relation_label)
-                )
-                self.execute(query)
-
-        for k, vs in relation_to_remove.items():
-            for v in vs:
-                query = (
-                    "MATCH (s:{} {{id: '{}'}})-[r:{}]-(t:{} {{id: '{}'}})\n".format(
-                        left, k, self._graph_relation_label, right, v) +
-                    "DELETE r\n"
-                )
-                self.execute(query)
+        pairs_to_add = [
+            {"source": str(k), "target": str(v)}
+            for k, vs in relations_to_add.items()
+            for v in vs
+        ]
+        if len(pairs_to_add) > 0:
+            query = set_intergraph_edges(
+                quote_label(left), quote_label(right),
+                self._graph_relation_label)
+            self._execute_in_batches(query, "pairs", pairs_to_add)
+
+        pairs_to_remove = [
+            {"source": str(k), "target": str(v)}
+            for k, vs in relation_to_remove.items()
+            for v in vs
+        ]
+        if len(pairs_to_remove) > 0:
+            query = (
+                "UNWIND $pairs AS pair\n" +
+                "MATCH (s:{} {{id: pair.source}})-[r:{}]-(t:{} {{id: pair.target}})\n".format(
+                    quote_label(left), self._graph_relation_label,
+                    quote_label(right)) +
+                "DELETE r\n"
+            )
+            self._execute_in_batches(query, "pairs", pairs_to_remove)
+
+    def _restrictive_update_incident_homs(self, node_id, g_m_g):
+        # Successors and the typings to them are fetched by one query
+        # instead of a 'successors' query followed by a 'get_typing'
+        # per successor (the typing edges are followed along paths
+        # of any length, as in 'get_typing')
+        query = (
+            "MATCH (:{} {{id: $id}})-[:{}]->(suc:{})\n".format(
+                self._graph_label, self._typing_label, self._graph_label) +
+            "OPTIONAL MATCH (n:{})-[:{}*1..]->(t)\n".format(
+                quote_label(node_id), self._graph_typing_label) +
+            "WHERE suc.id IN labels(t)\n" +
+            "RETURN suc.id as suc, collect([n.id, t.id]) as typing"
+        )
+        records = list(self.execute(query, id=str(node_id)))
+        if len(records) == 0:
+            return
+        nodes = self.get_graph(node_id).nodes()
+        for record in records:
+            suc = record["suc"]
+            typing = self._typing_from_pairs(
+                [pair for pair in record["typing"] if pair[0] is not None],
+                nodes, self.get_graph(suc).nodes())
+            self._update_mapping(
+                node_id, suc, compose(g_m_g, typing), old_mapping=typing)
 
     def _get_rule_liftings(self, graph_id, rule, instance, p_typing):
         pass
@@ -853,7 +939,11 @@ class Neo4jHierarchy(Hierarchy):
                  relation_label="binaryRelation",
                  graph_edge_label="edge",
                  graph_typing_label="typing",
-                 graph_relation_label="relation"):
+                 graph_relation_label="relation",
+                 max_connection_pool_size=None,
+                 connection_acquisition_timeout=None,
+                 max_transaction_retry_time=None,
+                 keep_alive=None):
         """Initialize driver.
 
         Parameters
@@ -881,6 +971,22 @@ class Neo4jHierarchy(Hierarchy):
             Relation type to use for edges encoding homomorphisms.
         graph_relation_label : str, optional
             Relation type to use for edges encoding relations.
+        max_connection_pool_size : int, optional
+            Maximum number of connections of the new driver's pool
+        connection_acquisition_timeout : float, optional
+            Maximum time (in seconds) to wait for a connection
+            from the pool of the new driver
+        max_transaction_retry_time : float, optional
+            Maximum time (in seconds) transactions are retried
+            by the new driver
+        keep_alive : bool, optional
+            Flag, if True TCP keep-alive is enabled for the
+            connections of the new driver
+
+        Only the driver configuration parameters that are set
+        are passed to the new driver, the others keep the defaults
+        of the installed driver. They are ignored if `driver`
+        is provided.
         """
         # The following idea is cool but it's not so easy:
         # as we have two types of nodes in the hierarchy:
@@ -893,8 +999,16 @@ class Neo4jHierarchy(Hierarchy):
         #     edge_label="hierarchyEdge")
 
         if driver is None:
+            config = {
+                "max_connection_pool_size": max_connection_pool_size,
+                "connection_acquisition_timeout":
+                    connection_acquisition_timeout,
+                "max_transaction_retry_time": max_transaction_retry_time,
+                "keep_alive": keep_alive
+            }
             self._driver = GraphDatabase.driver(
-                uri, auth=(user, password))
+                uri, auth=(user, password),
+                **{k: v for k, v in config.items() if v is not None})
         else:
             self._driver = driver
 
@@ -905,6 +1019,9 @@ class Neo4jHierarchy(Hierarchy):
         self._graph_typing_label = graph_typing_label
         self._graph_relation_label = graph_relation_label
 
+        self._graph_cache = OrderedDict()
+        self._local = threading.local()
+
         try:
             query = "CREATE " + constraint_query(
                 'n', self._graph_label, 'id')
@@ -1031,41 +1148,180 @@ class Neo4jHierarchy(Hierarchy):
 
     def close(self):
         """Close connection to the database."""
+        session = getattr(self._local, "session", None)
+        if session is not None:
+            session.close()
+            self._local.session = None
         self._driver.close()
 
-    def execute(self, query):
-        """Execute a Cypher query."""
-        with self._driver.session() as session:
-            if len(query) > 0:
-                result = session.run(query)
-                return result
+    def execute(self, query, **params):
+        """Execute a Cypher query.
+
+        Keyword arguments are passed to the query as parameters.
+        The query is run in the long-lived session of the current
+        thread. The first record of the result is fetched before
+        returning (so that errors are raised here), the remaining
+        records are buffered by the driver when the next query is
+        run in the session.
+        """
+        if len(query) > 0:
+            result = self._get_session().run(query, **params)
+            result.peek()
+            return result
+
+    def _execute_in_transaction(self, queries, **params):
+        """Execute a sequence of Cypher queries within one transaction.
+
+        The queries are sent to the database without waiting for
+        the results of the previous ones and are committed at once.
+        Keyword arguments are passed to every query as parameters.
+        """
+        with self._get_session().begin_transaction() as tx:
+            for query in queries:
+                tx.run(query, **params)
+
+    def _execute_in_batches(self, query, list_name, rows, **params):
+        """Execute an UNWIND query on a list of rows split in batches.
+
+        The list of rows is passed to the query as the parameter
+        `list_name`, every batch of at most `_write_batch_size` rows
+        is committed separately, so that the size of a transaction
+        does not grow with the size of the input.
+        """
+        for i in range(0, len(rows), self._write_batch_size):
+            params[list_name] = rows[i:i + self._write_batch_size]
+            self.execute(query, **params)
+
+    def _get_session(self):
+        """Get the session of the current thread (open it if needed).
+
+        Sessions are not thread-safe, therefore, every thread
+        using the hierarchy gets its own session.
+        """
+        session = getattr(self._local, "session", None)
+        if session is None or session.closed():
+            session = self._driver.session()
+            self._local.session = session
+        return session
 
     def _clear(self):
         """Clear the hierarchy."""
         query = clear_graph()
         result = self.execute(query)
+        self._invalidate_graph_cache()
         # self.drop_all_constraints()
         return result
 
     def _clear_all(self):
         query = "MATCH (n) DETACH DELETE n"
         self.execute(query)
+        self._invalidate_graph_cache()
 
     def _drop_all_constraints(self):
-        """Drop all the constraints on the hierarchy."""
-        with self._driver.session() as session:
-            for constraint in session.run("CALL db.constraints"):
-                session.run("DROP " + constraint[0])
+        """Drop all the constraints on the hierarchy.
 
-    def _access_graph(self, graph_id, edge_label=None):
-        """Access a graph of the hierarchy."""
+        If APOC is installed, the schema is dropped by a single
+        procedure call, otherwise the constraints are listed and
+        dropped within one transaction.
+        """
+        try:
+            self.execute("CALL apoc.schema.assert({}, {}, true)")
+        except ClientError:
+            constraints = [
+                record[0] for record in self.execute("CALL db.constraints")]
+            if len(constraints) > 0:
+                self._execute_in_transaction(
+                    ["DROP " + constraint for constraint in constraints])
+        # Cached graph objects assume their id constraints exist
+        self._invalidate_graph_cache()
+
+    def _graph_exists(self, graph_id):
+        """Test if the hierarchy contains a graph with the given id.
+
+        Only a boolean is returned by the query (instead of
+        fetching the ids of all the graphs).
+        """
+        query = (
+            "MATCH (n:{} {{id: $id}})\n".format(self._graph_label) +
+            "RETURN count(n) > 0 as graph_exists"
+        )
+        return self.execute(query, id=str(graph_id)).single()["graph_exists"]
+
+    def _access_graph(self, graph_id, edge_label=None, unique_node_ids=True):
+        """Access a graph of the hierarchy.
+
+        The Neo4jGraph objects are cached (in an LRU cache) by the pair
+        (graph id, edge label), so that repeated accesses to the
+        same graph do not re-create the object (and do not re-issue
+        the constraint creation query). If `unique_node_ids` is False,
+        the round trip creating the uniqueness constraint on node ids
+        is skipped for a new object (which is then not cached), this
+        is used by the callers that know that the constraint is
+        already set or that are about to drop it.
+        """
         if edge_label is None:
             edge_label = "edge"
+        key = (graph_id, edge_label)
+        if key in self._graph_cache:
+            self._graph_cache.move_to_end(key)
+            return self._graph_cache[key]
         g = Neo4jGraph(
             self._driver,
-            node_label=graph_id, edge_label=edge_label)
+            node_label=graph_id, edge_label=edge_label,
+            unique_node_ids=False)
+        # The graph shares the sessions of the hierarchy
+        g._local = self._local
+        if unique_node_ids:
+            try:
+                g._set_constraint('id')
+            except:
+                warnings.warn(
+                    "Failed to create id uniqueness constraint")
+            g.unique_node_ids = True
+            self._graph_cache[key] = g
+            if len(self._graph_cache) > self._graph_cache_size:
+                self._graph_cache.popitem(last=False)
         return g
 
+    @staticmethod
+    def _typing_from_pairs(pairs, source_nodes, target_nodes):
+        """Build a typing dict from the pairs of ids stored in the db."""
+        typing = {}
+        for node_id, type_id in pairs:
+            if node_id not in source_nodes:
+                try:
+                    node_id = int(node_id)
+                except:
+                    pass
+            if type_id not in target_nodes:
+                try:
+                    type_id = int(type_id)
+                except:
+                    pass
+            typing[node_id] = type_id
+        return typing
+
+    def _skeleton_edge_attrs_query(self, edge_label):
+        """Generate query retreiving attributes of a skeleton edge.
+
+        The ids of the source and the target graphs are expected to
+        be passed as the query parameters `$source` and `$target`.
+        """
+        return (
+            "MATCH (n:{} {{ id: $source }})-[rel:{}]->(m:{} {{ id: $target }})\n".format(
+                self._graph_label, edge_label, self._graph_label) +
+            "RETURN properties(rel) as attributes\n"
+        )
+
+    def _invalidate_graph_cache(self, graph_id=None):
+        """Remove cached graph objects (all of them if `graph_id` is None)."""
+        if graph_id is None:
+            self._graph_cache.clear()
+        else:
+            for key in list(self._graph_cache.keys()):
+                if key[0] == graph_id:
+                    del self._graph_cache[key]
+
 
 class TypedNeo4jGraph(Neo4jHierarchy):
     """Class implementing two level hiearchy.
@@ -1137,6 +1393,8 @@ class TypedNeo4jGraph(Neo4jHierarchy):
         """
         self._driver = GraphDatabase.driver(
             uri, auth=(user, password))
+        self._graph_cache = OrderedDict()
+        self._local = threading.local()
 
         if clear is True:
             self._clear()
@@ -1152,9 +1410,16 @@ class TypedNeo4jGraph(Neo4jHierarchy):
         self._schema_node_label = "type"
         self._data_node_label = "node"
 
+        try:
+            query = "CREATE " + constraint_query(
+                'n', self._graph_label, 'id')
+            self.execute(query)
+        except:
+            pass
+
         # create data/schema nodes
         if schema_graph is not None:
-            if self._schema_node_label not in self.graphs():
+            if not self._graph_exists(self._schema_node_label):
                 self.add_graph_from_data(
                     self._schema_node_label,
                     schema_graph["nodes"],
@@ -1167,7 +1432,7 @@ class TypedNeo4jGraph(Neo4jHierarchy):
                 )
 
         if data_graph is not None:
-            if self._data_node_label not in self.graphs():
+            if not self._graph_exists(self._data_node_label):
                 self.add_graph_from_data(
                     self._data_node_label,
                     data_graph["nodes"],
@@ -1514,8 +1514,10 @@ class Neo4jHierarchy(object):
                 v_id = rename_nodes[v]
             else:
                 v_id = v
-            if not (u, v) in visited and not (v, u) in visited:
-                visited.add((u, v))
+            # relations are undirected, key them by the unordered pair
+            relation_key = frozenset((u, v))
+            if relation_key not in visited:
+                visited.add(relation_key)
                 json_data["relations"].append({
                     "from": u_id,
                     "to": v_id,
@@ -75,6 +75,18 @@ class NXGraph(Graph):
         """
         return self._graph.adj[s][t]
 
+    def exists_edge(self, s, t):
+        """Check if an edge exists.
+
+        Parameters
+        ----------
+        s : hashable
+            Source node id.
+        t : hashable
+            Target node id.
+        """
+        return self._graph.has_edge(s, t)
+
     def add_node(self, node_id, attrs=None):
         """Abstract method for adding a node.
 
@@ -523,10 +535,50 @@ class NXGraph(Graph):
     def copy(cls, graph):
         """Copy the input graph object."""
         new_graph = cls()
+        if isinstance(graph, NXGraph):
+            # Copy the underlying adjacency directly, bypassing the
+            # per-element existence checks of `add_node`/`add_edge`
+            new_graph._graph.add_nodes_from(
+                (n, cls._copy_attrs(attrs))
+                for n, attrs in graph._graph.nodes(data=True))
+            new_graph._graph.add_edges_from(
+                (s, t, cls._copy_attrs(attrs))
+                for s, t, attrs in graph._graph.edges(data=True))
+            return new_graph
         new_graph.add_nodes_from(graph.nodes(data=True))
         new_graph.add_edges_from(graph.edges(data=True))
         return new_graph
 
+    @staticmethod
+    def _copy_attrs(attrs):
+        new_attrs = safe_deepcopy_dict(attrs)
+        normalize_attrs(new_attrs)
+        return new_attrs
+
+    def to_json(self):
+        """Create a JSON representation of a graph.
+
+        Reads the attributes from the data views of the underlying
+        NetworkX graph in a single pass over the nodes and the edges.
+        """
+        j_data = {"edges": [], "nodes": []}
+        for node, node_attrs in self._graph.nodes(data=True):
+            j_data["nodes"].append({
+                "id": node,
+                "attrs": {
+                    key: value.to_json() for key, value in node_attrs.items()
+                }
+            })
+        for s, t, edge_attrs in self._graph.edges(data=True):
+            j_data["edges"].append({
+                "from": s,
+                "to": t,
+                "attrs": {
+                    key: value.to_json() for key, value in edge_attrs.items()
+                }
+            })
+        return j_data
+
     def nodes_disconnected_from(self, node_id):
         """Find nodes disconnected from the input node."""
         components = nx.weakly_connected_components(
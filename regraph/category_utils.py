@@ -39,6 +39,18 @@ def compose(d1, d2):
     return res
 
 
+def _preimages(mapping):
+    """Index the keys of a homomorphism by their values.
+
+    Replaces repeated `keys_by_value` scans with a single pass
+    over the mapping (preserving the order of the keys).
+    """
+    index = dict()
+    for key, value in mapping.items():
+        index.setdefault(value, []).append(key)
+    return index
+
+
 def is_total_homomorphism(elements, mapping):
     """Return True if mapping is total."""
     return set(elements) == set(mapping.keys())
@@ -63,28 +75,37 @@ def check_homomorphism(source, target, dictionary, total=True):
     # check if there is mapping for all the nodes of source graph
     if total:
         check_totality(source.nodes(), dictionary)
-    if not set(dictionary.values()).issubset(target.nodes()):
+    image = set(dictionary.values())
+    target_nodes = set(target.nodes())
+    if not image.issubset(target_nodes):
         raise InvalidHomomorphism(
             "The image nodes {} do not exist ".format(
-                set(dictionary.values()) - set(target.nodes())) +
+                image - target_nodes) +
             "in the target graph (existing nodes '{}') ".format(
                 target.nodes()) +
             "in dictionary '{}'".format(dictionary)
         )
 
-    # check connectivity
+    # check connectivity and sets of attributes of edges
+    # (homomorphism = set inclusion) in a single pass
     for s, t in source.edges():
-        try:
-            if (s in dictionary.keys() and
-                    t in dictionary.keys() and
-                    not (dictionary[s], dictionary[t])
-                    in target.edges()):
-                raise InvalidHomomorphism(
-                    "Connectivity is not preserved!"
-                    " Was expecting an edge between '{}' and '{}'".format(
-                        dictionary[s], dictionary[t]))
-        except KeyError:
-            pass
+        if s not in dictionary or t not in dictionary:
+            continue
+        if not target.exists_edge(dictionary[s], dictionary[t]):
+            raise InvalidHomomorphism(
+                "Connectivity is not preserved!"
+                " Was expecting an edge between '{}' and '{}'".format(
+                    dictionary[s], dictionary[t]))
+        if not valid_attributes(
+                source.get_edge(s, t),
+                target.get_edge(dictionary[s], dictionary[t])):
+            raise InvalidHomomorphism(
+                "Attributes of edges ({})-({}) ({}) and ".format(
+                    s, t, source.get_edge(s, t)) +
+                "({})-({}) ({}) do not match!".format(
+                    dictionary[s],
+                    dictionary[t],
+                    target.get_edge(dictionary[s], dictionary[t])))
 
     for s, t in dictionary.items():
             # check sets of attributes of nodes (here homomorphism = set
@@ -96,23 +117,6 @@ def check_homomorphism(source, target, dictionary, total=True):
                 "target: '{}' {} do not match!".format(
                     t, target.get_node(t))
             )
-
-    # check sets of attributes of edges (homomorphism = set inclusion)
-    for s1, s2 in source.edges():
-        try:
-            if (s1 in dictionary.keys() and s2 in dictionary.keys() and
-                    not valid_attributes(
-                        source.get_edge(s1, s2),
-                        target.get_edge(dictionary[s1], dictionary[s2]))):
-                raise InvalidHomomorphism(
-                    "Attributes of edges ({})-({}) ({}) and ".format(
-                        s1, s2, source.get_edge(s1, s2)) +
-                    "({})-({}) ({}) do not match!".format(
-                        dictionary[s1],
-                        dictionary[s2],
-                        target.get_edge(dictionary[s1], dictionary[s2])))
-        except KeyError:
-            pass
     return True
 
 
@@ -222,11 +226,12 @@ def pushout(a, b, c, a_b, a_c, inplace=False):
 
     b_d = id_of(b.nodes())
     c_d = dict()
+    a_c_preimages = _preimages(a_c)
 
     # Add/merge nodes
     merged_nodes = dict()
     for c_n in c.nodes():
-        a_keys = keys_by_value(a_c, c_n)
+        a_keys = a_c_preimages.get(c_n, [])
         # Add nodes
         if len(a_keys) == 0:
             if c_n not in d.nodes():
@@ -288,20 +293,20 @@ def pushout(a, b, c, a_b, a_c, inplace=False):
                 b_d[node] = new_name
 
             for k in c_d.keys():
-                for vv in keys_by_value(a_c, k):
+                for vv in a_c_preimages.get(k, []):
                     if b_d[a_b[vv]] == new_name:
                         c_d[k] = new_name
 
     # Add edges
     for (n1, n2) in c.edges():
-        if (c_d[n1], c_d[n2]) not in d.edges():
+        if not d.exists_edge(c_d[n1], c_d[n2]):
             d.add_edge(
                 c_d[n1], c_d[n2],
                 c.get_edge(n1, n2))
 
     # Add node attrs
     for c_n in c.nodes():
-        a_keys = keys_by_value(a_c, c_n)
+        a_keys = a_c_preimages.get(c_n, [])
         # Add attributes to the nodes which stayed invariant
         if len(a_keys) == 1:
             attrs_to_add = dict_sub(
@@ -358,10 +363,11 @@ def pullback_complement(a, b, d, a_b, b_d, inplace=False):
 
     a_c = dict()
     c_d = id_of(c.nodes())
+    a_b_preimages = _preimages(a_b)
 
     # Remove/clone nodes
     for b_node in b.nodes():
-        a_keys = keys_by_value(a_b, b_node)
+        a_keys = a_b_preimages.get(b_node, [])
         # Remove nodes
         if len(a_keys) == 0:
             c.remove_node(b_d[b_node])
@@ -384,13 +390,13 @@ def pullback_complement(a, b, d, a_b, b_d, inplace=False):
 
     # Remove edges
     for (b_n1, b_n2) in b.edges():
-        a_keys_1 = keys_by_value(a_b, b_n1)
-        a_keys_2 = keys_by_value(a_b, b_n2)
+        a_keys_1 = a_b_preimages.get(b_n1, [])
+        a_keys_2 = a_b_preimages.get(b_n2, [])
         if len(a_keys_1) > 0 and len(a_keys_2) > 0:
             for k1 in a_keys_1:
                 for k2 in a_keys_2:
-                    if (k1, k2) not in a.edges() and\
-                       (a_c[k1], a_c[k2]) in c.edges():
+                    if not a.exists_edge(k1, k2) and\
+                       c.exists_edge(a_c[k1], a_c[k2]):
                         c.remove_edge(a_c[k1], a_c[k2])
 
     # Remove node attrs
@@ -423,9 +429,10 @@ def image_factorization(a, b, a_b):
     a_c = {}
     c_b = {}
 
+    a_b_preimages = _preimages(a_b)
     for n in b.nodes():
-        if n in a_b.values():
-            a_nodes = keys_by_value(a_b, n)
+        if n in a_b_preimages:
+            a_nodes = a_b_preimages[n]
             if len(a_nodes) > 1:
                 new_id = c.merge_nodes(a_nodes)
             else:
@@ -440,16 +447,18 @@ def image_factorization(a, b, a_b):
 def get_unique_map_to_pullback(p, p_a, p_b, z_a, z_b):
     """Find a unique map to pullback."""
     z_p = dict()
+    z_a_preimages = _preimages(z_a)
+    z_b_preimages = _preimages(z_b)
     for value in p:
         z_keys_from_a = set()
         if value in p_a.keys():
             a_value = p_a[value]
-            z_keys_from_a = set(keys_by_value(z_a, a_value))
+            z_keys_from_a = set(z_a_preimages.get(a_value, []))
 
         z_keys_from_b = set()
         if value in p_b.keys():
             b_value = p_b[value]
-            z_keys_from_b.update(keys_by_value(z_b, b_value))
+            z_keys_from_b.update(z_b_preimages.get(b_value, []))
 
         z_keys = z_keys_from_a.intersection(z_keys_from_b)
         for z_key in z_keys:
@@ -461,15 +470,17 @@ def get_unique_map_to_pullback(p, p_a, p_b, z_a, z_b):
 def get_unique_map_from_pushout(p, a_p, b_p, a_z, b_z):
     """Find a unique map to pushout."""
     p_z = dict()
+    a_p_preimages = _preimages(a_p)
+    b_p_preimages = _preimages(b_p)
     for value in p:
         z_values = set()
 
-        a_values = set(keys_by_value(a_p, value))
+        a_values = set(a_p_preimages.get(value, []))
         for a_value in a_values:
             if a_value in a_z.keys():
                 z_values.add(a_z[a_value])
 
-        b_values = set(keys_by_value(b_p, value))
+        b_values = set(b_p_preimages.get(value, []))
         for b_value in b_values:
             if b_value in b_z.keys():
                 z_values.add(b_z[b_value])
@@ -491,13 +502,15 @@ def get_unique_map_to_pullback_complement(a_p, p_c,
             "Morphism 'a_p' is required to be a mono "
             "to use the UP of the pullback complement")
     z_p = {}
+    a_prime_z_preimages = _preimages(a_prime_z)
+    p_c_preimages = _preimages(p_c)
     for z_element, c_element in z_c.items():
-        a_prime_elements = keys_by_value(a_prime_z, z_element)
+        a_prime_elements = a_prime_z_preimages.get(z_element, [])
         p_elements1 = set()  # candidate p elements
         for a_prime_element in a_prime_elements:
             p_elements1.add(a_p[a_prime_a[a_prime_element]])
         # resolve ambiguity going the other way
-        p_elements2 = keys_by_value(p_c, c_element)
+        p_elements2 = p_c_preimages.get(c_element, [])
         if len(p_elements1) == 0:
             if len(p_elements2) == 1:
                 z_p[z_element] = list(p_elements2)[0]
@@ -1,4 +1,7 @@
 """Parsing of the graph transformation commands."""
+import copy
+import functools
+import re
 
 from pyparsing import (Word, alphanums, nums, CaselessKeyword, Suppress,
                        Literal, delimitedList, Dict, Group,
@@ -194,3 +197,65 @@ command = (
 )
 
 parser = command.setResultsName("keyword") + "."
+
+
+# Structural commands without attributes (e.g. "DELETE_NODE 1." or
+# "ADD_EDGE 'a' 'b'.") are recognized by a regular expression, without
+# invoking the full parser
+_FAST_NODE = r"(\d+|'[^'\\]*'|\"[^\"\\]*\")"
+_FAST_COMMAND = re.compile(
+    r"^\s*(delete_node|delete_edge|add_edge)\s+" + _FAST_NODE +
+    r"(?:\s+" + _FAST_NODE + r")?\s*\.", re.IGNORECASE)
+
+
+def _fast_node(token):
+    if token[0] in "'\"":
+        return token[1:-1]
+    return int(token)
+
+
+def _fast_parse_command(command):
+    """Parse a structural command by a regex, return None if not matched."""
+    match = _FAST_COMMAND.match(command)
+    if match is None:
+        return None
+    keyword, node_1, node_2 = match.groups()
+    keyword = keyword.lower()
+    if keyword == "delete_node":
+        if node_2 is not None:
+            return None
+        return {"keyword": keyword, "node": _fast_node(node_1)}
+    if node_2 is None:
+        return None
+    return {
+        "keyword": keyword,
+        "node_1": _fast_node(node_1),
+        "node_2": _fast_node(node_2)
+    }
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_command(command):
+    return parser.parseString(command).asDict()
+
+
+def parse_command(command):
+    """Parse a command into a dictionary.
+
+    Structural commands without attributes are parsed by a regular
+    expression. For other commands the results of parsing are cached
+    by the command string, a copy of the cached dictionary is returned,
+    so that the caller can modify it.
+    """
+    parsed = _fast_parse_command(command)
+    if parsed is not None:
+        return parsed
+    parsed = copy.deepcopy(_parse_command(command))
+    # Depending on the version of pyparsing, the keyword is either
+    # a string or the list of all the tokens of the command, and
+    # the attributes are either a dict or a list of key-value pairs
+    if isinstance(parsed["keyword"], list):
+        parsed["keyword"] = parsed["keyword"][0]
+    if isinstance(parsed.get("attributes"), list):
+        parsed["attributes"] = dict(parsed["attributes"])
+    return parsed
@@ -506,8 +506,10 @@ class Hierarchy(ABC):
                 v_id = rename_nodes[v]
             else:
                 v_id = v
-            if not (u, v) in visited and not (v, u) in visited:
-                visited.add((u, v))
+            # relations are undirected, key them by the unordered pair
+            relation_key = frozenset((u, v))
+            if relation_key not in visited:
+                visited.add(relation_key)
                 json_data["relations"].append({
                     "from": u_id,
                     "to": v_id,
@@ -665,10 +667,24 @@ class Hierarchy(ABC):
 
     def get_ancestors(self, graph_id):
         """Return ancestors of a graph with the typing morphisms."""
+        return self._get_ancestors(graph_id, dict())
+
+    def _get_ancestors(self, graph_id, visited):
+        """Return ancestors of a graph memoizing the visited graphs.
+
+        `visited` is a dictionary whose keys are the ids of the graphs
+        whose ancestors are already computed and whose values are
+        these ancestors, so that every graph of the hierarchy is
+        processed at most once (even if it is reachable by many paths).
+        """
+        if graph_id in visited:
+            return {
+                k: dict(v) for k, v in visited[graph_id].items()
+            }
         ancestors = dict()
         for pred in self.predecessors(graph_id):
             typing = self.get_typing(pred, graph_id)
-            pred_ancestors = self.get_ancestors(pred)
+            pred_ancestors = self._get_ancestors(pred, visited)
             if pred in ancestors.keys():
                 ancestors.update(pred_ancestors)
             else:
@@ -678,14 +694,27 @@ class Hierarchy(ABC):
                     ancestors[anc].update(compose(anc_typing, typing))
                 else:
                     ancestors[anc] = compose(anc_typing, typing)
+        visited[graph_id] = {k: dict(v) for k, v in ancestors.items()}
         return ancestors
 
     def get_descendants(self, graph_id, maybe=None):
         """Return descendants of a graph with the typing morphisms."""
+        return self._get_descendants(graph_id, maybe, dict())
+
+    def _get_descendants(self, graph_id, maybe, visited):
+        """Return descendants of a graph memoizing the visited graphs.
+
+        See `_get_ancestors` for the meaning of `visited`.
+        """
+        if graph_id in visited:
+            return {
+                k: dict(v) for k, v in visited[graph_id].items()
+            }
         descendants = dict()
         for successor in self.successors(graph_id):
             mapping = self.get_typing(graph_id, successor)
-            typing_descendants = self.get_descendants(successor, maybe)
+            typing_descendants = self._get_descendants(
+                successor, maybe, visited)
             if successor in descendants.keys():
                 descendants[successor].update(mapping)
             else:
@@ -695,6 +724,7 @@ class Hierarchy(ABC):
                     descendants[anc].update(compose(mapping, typ))
                 else:
                     descendants[anc] = compose(mapping, typ)
+        visited[graph_id] = {k: dict(v) for k, v in descendants.items()}
         return descendants
 
     def compose_path_typing(self, path):
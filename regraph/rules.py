@@ -10,7 +10,7 @@ import warnings
 from regraph.backends.networkx.graphs import NXGraph
 from regraph.backends.networkx.plotting import plot_rule
 
-from regraph.command_parser import parser
+from regraph.command_parser import parse_command
 from regraph.utils import (keys_by_value,
                            make_canonical_commands,
                            dict_sub,
@@ -30,6 +30,151 @@ from regraph.exceptions import (ReGraphWarning, ParsingError,
                                 RuleError)
 
 
+# Sentinel passed as `p_lhs`/`p_rhs` to the rule constructor by
+# callers that know these homomorphisms are the identity on the nodes of
+# `p`: they are built without calling `identity` and are not checked
+_IDENTITY = object()
+
+
+class _ReverseIndexedDict(dict):
+    """Dictionary maintaining the index of its keys by value.
+
+    The index allows to find the keys with a given value without
+    scanning the dictionary (see `keys_by_value`). It is kept up to
+    date by all the methods modifying the dictionary.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._index = dict()
+        # Insertion positions of the keys, used to return the keys
+        # in the order of the dictionary
+        self._positions = dict()
+        self._next_position = 0
+        self.update(*args, **kwargs)
+
+    def __reduce__(self):
+        return (self.__class__, (dict(self),))
+
+    def __setitem__(self, key, value):
+        if key in self:
+            self._unindex(key, dict.__getitem__(self, key))
+        else:
+            self._positions[key] = self._next_position
+            self._next_position += 1
+        dict.__setitem__(self, key, value)
+        self._index.setdefault(value, set()).add(key)
+
+    def __delitem__(self, key):
+        value = dict.__getitem__(self, key)
+        dict.__delitem__(self, key)
+        self._unindex(key, value)
+        del self._positions[key]
+
+    def _unindex(self, key, value):
+        keys = self._index[value]
+        keys.discard(key)
+        if len(keys) == 0:
+            del self._index[value]
+
+    def pop(self, key, *default):
+        if key in self:
+            value = dict.__getitem__(self, key)
+            del self[key]
+            return value
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        key, value = dict.popitem(self)
+        self._unindex(key, value)
+        del self._positions[key]
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def clear(self):
+        dict.clear(self)
+        self._index.clear()
+        self._positions.clear()
+
+    def copy(self):
+        return self.__class__(self)
+
+    def keys_by_value(self, value):
+        """Return the list of keys with the given value."""
+        return sorted(
+            self._index.get(value, ()), key=self._positions.__getitem__)
+
+
+def _apply_clone(rule, action):
+    rule.inject_clone_node(action["node"], action.get("node_name"))
+
+
+def _apply_merge(rule, action):
+    rule.inject_merge_nodes(action["nodes"], action.get("node_name"))
+
+
+def _apply_add_node(rule, action):
+    rule.inject_add_node(action.get("node"), action.get("attributes", {}))
+
+
+def _apply_delete_node(rule, action):
+    rule.inject_remove_node(action["node"])
+
+
+def _apply_add_edge(rule, action):
+    rule.inject_add_edge(
+        action["node_1"], action["node_2"], action.get("attributes", {}))
+
+
+def _apply_delete_edge(rule, action):
+    rule.inject_remove_edge(action["node_1"], action["node_2"])
+
+
+def _apply_add_node_attrs(rule, action):
+    rule.inject_add_node_attrs(action["node"], action["attributes"])
+
+
+def _apply_add_edge_attrs(rule, action):
+    rule.inject_add_edge_attrs(
+        action["node_1"], action["node_2"], action["attributes"])
+
+
+def _apply_delete_node_attrs(rule, action):
+    rule.inject_remove_node_attrs(action["node"], action["attributes"])
+
+
+def _apply_delete_edge_attrs(rule, action):
+    rule.inject_remove_edge_attrs(
+        action["node_1"], action["node_2"], action["attributes"])
+
+
+# Handlers applying the parsed commands to a rule (by command keyword)
+_COMMAND_HANDLERS = {
+    "clone": _apply_clone,
+    "merge": _apply_merge,
+    "add_node": _apply_add_node,
+    "delete_node": _apply_delete_node,
+    "add_edge": _apply_add_edge,
+    "delete_edge": _apply_delete_edge,
+    "add_node_attrs": _apply_add_node_attrs,
+    "add_edge_attrs": _apply_add_edge_attrs,
+    "delete_node_attrs": _apply_delete_node_attrs,
+    "delete_edge_attrs": _apply_delete_edge_attrs,
+}
+
+
 class Rule(object):
     """Class representing rewriting rules.
 
@@ -70,8 +215,10 @@ class Rule(object):
         values -- nodes of `rhs`.
     """
 
+    __slots__ = ("p", "lhs", "rhs", "_p_lhs", "_p_rhs")
+
     def __init__(self, p=None, lhs=None, rhs=None,
-                 p_lhs=None, p_rhs=None):
+                 p_lhs=None, p_rhs=None, copy_inputs=True):
         """Rule initialization.
 
         A rule is initialized with p, lhs, rhs graphs, and
@@ -97,6 +244,10 @@ class Rule(object):
             Homomorphism between `p` and `rhs` given by
             a dictionary with keys -- nodes of `p`,
             values -- nodes of `rhs`
+        copy_inputs : bool, optional
+            If True (default), the input graphs are copied, otherwise
+            the rule takes the ownership of the input graphs (this
+            is used by callers that pass freshly created graphs)
         """
         if p is None:
             p = NXGraph()
@@ -105,24 +256,53 @@ class Rule(object):
         if rhs is None:
             rhs = p
 
-        self.p = NXGraph.copy(p)
-        self.lhs = NXGraph.copy(lhs)
-        self.rhs = NXGraph.copy(rhs)
-
-        if not p_lhs:
+        if copy_inputs:
+            self.p = NXGraph.copy(p)
+            self.lhs = NXGraph.copy(lhs)
+            self.rhs = NXGraph.copy(rhs)
+        else:
+            # The three graphs of the rule should be distinct objects
+            self.p = p
+            self.lhs = lhs if lhs is not p else NXGraph.copy(lhs)
+            self.rhs = rhs if rhs is not p and rhs is not lhs\
+                else NXGraph.copy(rhs)
+
+        if p_lhs is _IDENTITY:
+            self.p_lhs = {n: n for n in p.nodes()}
+        elif not p_lhs:
             self.p_lhs = identity(p, lhs)
         else:
             check_homomorphism(p, lhs, p_lhs)
-            self.p_lhs = copy.deepcopy(p_lhs)
+            self.p_lhs = p_lhs
 
-        if not p_rhs:
+        if p_rhs is _IDENTITY:
+            self.p_rhs = {n: n for n in p.nodes()}
+        elif not p_rhs:
             self.p_rhs = identity(p, rhs)
         else:
             check_homomorphism(p, rhs, p_rhs)
-            self.p_rhs = copy.deepcopy(p_rhs)
+            self.p_rhs = p_rhs
 
         return
 
+    @property
+    def p_lhs(self):
+        """Homomorphism from `p` to `lhs`."""
+        return self._p_lhs
+
+    @p_lhs.setter
+    def p_lhs(self, mapping):
+        self._p_lhs = _ReverseIndexedDict(mapping)
+
+    @property
+    def p_rhs(self):
+        """Homomorphism from `p` to `rhs`."""
+        return self._p_rhs
+
+    @p_rhs.setter
+    def p_rhs(self, mapping):
+        self._p_rhs = _ReverseIndexedDict(mapping)
+
     @classmethod
     def from_transform(cls, pattern, commands=None):
         """Initialize a rule from the transformation.
@@ -148,15 +328,15 @@ class Rule(object):
             RuleError(
                 "The initial pattern should be an instance of NXGraph")
 
-        lhs = pattern
-
-        p = NXGraph.copy(lhs)
-        rhs = NXGraph.copy(lhs)
+        # The pattern is copied once for each of the graphs of the rule,
+        # which then takes their ownership
+        lhs = NXGraph.copy(pattern)
+        p = NXGraph.copy(pattern)
+        rhs = NXGraph.copy(pattern)
 
-        p_lhs = dict([(n, n) for n in pattern.nodes()])
-        p_rhs = dict([(n, n) for n in pattern.nodes()])
-
-        rule = cls(p, lhs, rhs, p_lhs, p_rhs)
+        # The three graphs are copies of the pattern, so both
+        # homomorphisms are the identity
+        rule = cls(p, lhs, rhs, _IDENTITY, _IDENTITY, copy_inputs=False)
 
         # if the commands are provided, perform respecitive transformations
         if commands:
@@ -171,79 +351,39 @@ class Rule(object):
             actions = []
             for command in command_strings:
                 try:
-                    parsed = parser.parseString(command).asDict()
+                    parsed = parse_command(command)
                     actions.append(parsed)
                 except:
-                    raise ParsingError("Cannot parse command '%s'" % command)
+                    raise ParsingError(
+                        "Cannot parse command '{}'".format(command))
 
             for action in actions:
-                if action["keyword"] == "clone":
-                    node_name = None
-                    if "node_name" in action.keys():
-                        node_name = action["node_name"]
-                    rule.inject_clone_node(action["node"], node_name)
-                elif action["keyword"] == "merge":
-                    node_name = None
-                    if "node_name" in action.keys():
-                        node_name = action["node_name"]
-                    rule.inject_merge_nodes(
-                        action["nodes"],
-                        node_name)
-                elif action["keyword"] == "add_node":
-                    name = None
-                    attrs = {}
-                    if "node" in action.keys():
-                        name = action["node"]
-                    if "attributes" in action.keys():
-                        attrs = action["attributes"]
-                    rule.inject_add_node(name, attrs)
-                elif action["keyword"] == "delete_node":
-                    rule.inject_remove_node(action["node"])
-                elif action["keyword"] == "add_edge":
-                    attrs = {}
-                    if "attributes" in action.keys():
-                        attrs = action["attributes"]
-                    rule.inject_add_edge(
-                        action["node_1"],
-                        action["node_2"],
-                        attrs)
-                elif action["keyword"] == "delete_edge":
-                    rule.inject_remove_edge(
-                        action["node_1"],
-                        action["node_2"])
-                elif action["keyword"] == "add_node_attrs":
-                    rule.inject_add_node_attrs(
-                        action["node"],
-                        action["attributes"])
-                elif action["keyword"] == "add_edge_attrs":
-                    rule.inject_add_edge_attrs(
-                        action["node_1"],
-                        action["node_2"],
-                        action["attributes"])
-                elif action["keyword"] == "delete_node_attrs":
-                    rule.inject_remove_node_attrs(
-                        action["node"],
-                        action["attributes"])
-                elif action["keyword"] == "delete_edge_attrs":
-                    rule.inject_remove_edge_attrs(
-                        action["node_1"],
-                        action["node_2"],
-                        action["attributes"])
-                else:
-                    raise ParsingError("Unknown command %s" %
-                                       action["keyword"])
+                handler = _COMMAND_HANDLERS.get(action["keyword"])
+                if handler is None:
+                    raise ParsingError("Unknown command {}".format(
+                        action["keyword"]))
+                handler(rule, action)
         return rule
 
     def __eq__(self, rule):
         """Rule equality operator."""
+        # Compare the homomorphisms and the sizes of the graphs
+        # first, so that different rules are told apart cheaply
+        if self.p_lhs != rule.p_lhs or self.p_rhs != rule.p_rhs:
+            return False
+        for g1, g2 in [(self.lhs, rule.lhs), (self.rhs, rule.rhs)]:
+            if len(g1.nodes()) != len(g2.nodes()) or\
+               len(g1.edges()) != len(g2.edges()):
+                return False
         return (
             self.p == rule.p and
             self.lhs == rule.lhs and
-            self.rhs == rule.rhs and
-            self.p_lhs == rule.p_lhs and
-            self.p_rhs == rule.p_rhs
+            self.rhs == rule.rhs
         )
 
+    # Rules are mutable, they are not hashable
+    __hash__ = None
+
     def __str__(self):
         """String representation of a rule."""
         return (
@@ -284,17 +424,17 @@ class Rule(object):
             If the node to clone is already being removed by the rule
             or if node with the specified clone id already exists in p.
         """
-        p_nodes = keys_by_value(self.p_lhs, n)
+        p_nodes = self.p_lhs.keys_by_value(n)
         if len(p_nodes) == 0:
             raise RuleError(
-                "Cannot inject cloning: node '%s' is already "
+                "Cannot inject cloning: node '{}' is already "
                 "being removed by the rule, revert its removal "
-                "first" % n)
+                "first".format(n))
         else:
             if new_node_id is not None and new_node_id in self.p.nodes():
                 raise RuleError(
-                    "Node with id '%s' already exists in the "
-                    "preserved part!")
+                    "Node with id '{}' already exists in the "
+                    "preserved part!".format(new_node_id))
             some_p_node = p_nodes[0]
             p_new_node_id = self.p.clone_node(some_p_node, new_node_id)
             self.p_lhs[p_new_node_id] = n
@@ -324,9 +464,10 @@ class Rule(object):
             raise RuleError(
                 "Node '{}' does not exist in the preserved part".format(
                     p_node_id))
-        if self.p_rhs[p_node_id] in self.rhs.nodes():
-            self.rhs.remove_node(self.p_rhs[p_node_id])
-            affected_nodes = keys_by_value(self.p_rhs, self.p_rhs[p_node_id])
+        rhs_node_id = self.p_rhs[p_node_id]
+        if rhs_node_id in self.rhs.nodes():
+            self.rhs.remove_node(rhs_node_id)
+            affected_nodes = self.p_rhs.keys_by_value(rhs_node_id)
             for node in affected_nodes:
                 del self.p_rhs[node]
             del self.p_lhs[p_node_id]
@@ -349,7 +490,7 @@ class Rule(object):
             or if a corresponding edge in `p` does not exist.
         """
 
-        if (n1, n2) in self.p.edges():
+        if self.p.exists_edge(n1, n2):
             self.p.remove_edge(n1, n2)
             self.rhs.remove_edge(self.p_rhs[n1], self.p_rhs[n2])
         else:
@@ -418,7 +559,7 @@ class Rule(object):
                 "part of the rule".format(n2)
             )
 
-        if (n1, n2) not in self.p.edges():
+        if not self.p.exists_edge(n1, n2):
             raise RuleError(
                 "Edge '{}->{}' does not exist in the preserved "
                 "part of the rule".format(n1, n2)
@@ -507,7 +648,7 @@ class Rule(object):
             raise RuleError(
                 "Node with the id '{}' does not exist in the "
                 "right-hand side of the rule".format(n2))
-        if (n1, n2) in self.rhs.edges():
+        if self.rhs.exists_edge(n1, n2):
             raise RuleError(
                 "Edge '{}->{}' already exists in the right-"
                 "hand side of the rule".format(n1, n2)
@@ -569,14 +710,15 @@ class Rule(object):
         # Update graphs
         new_name = None
 
+        p_nodes = self.p.nodes()
         nodes_to_merge = set()
         for n in node_list:
-            if n in self.p.nodes():
+            if n in p_nodes:
                 rhs_node = self.p_rhs[n]
             else:
                 raise RuleError(
                     "Node with the id '{}' does not exist in the "
-                    "preserved part of the rule".fromat(n)
+                    "preserved part of the rule".format(n)
                 )
             nodes_to_merge.add(rhs_node)
         new_name = self.rhs.merge_nodes(
@@ -584,12 +726,10 @@ class Rule(object):
             node_id=node_id
         )
 
-        # Update mappings
-        for n in node_list:
-            if n in self.p.nodes():
-                self.p_rhs[n] = new_name
+        # Update mappings (the preimages of the merged rhs nodes
+        # include all the nodes of `node_list`)
         for r_node in nodes_to_merge:
-            merged_ps = keys_by_value(self.p_rhs, r_node)
+            merged_ps = self.p_rhs.keys_by_value(r_node)
             for p in merged_ps:
                 self.p_rhs[p] = new_name
         return new_name
@@ -636,7 +776,7 @@ class Rule(object):
             `rhs`, or if an edge is incident to smth thats
             is going to be removed by the rule.
         """
-        if (n1, n2) not in self.rhs.edges():
+        if not self.rhs.exists_edge(n1, n2):
             raise RuleError(
                 "Edge '{}->{}' does not exist in the "
                 "right-hand side of the rule ".format(n1, n2)
@@ -663,14 +803,14 @@ class Rule(object):
         """
         if n not in self.lhs.nodes():
             raise RuleError(
-                "Node '%s' does not exist in the left hand "
-                "side of the rule" % n)
+                "Node '{}' does not exist in the left hand "
+                "side of the rule".format(n))
 
-        p_keys = keys_by_value(self.p_lhs, n)
+        p_keys = self.p_lhs.keys_by_value(n)
         if len(p_keys) == 0:
             raise RuleError(
-                "Node '%s' is being removed by the rule, "
-                "cannot update attributes" % n)
+                "Node '{}' is being removed by the rule, "
+                "cannot update attributes".format(n))
         for k in p_keys:
             # self.p.node[k] = None
             self.p.set_node_attrs(k, {}, update=True)
@@ -679,46 +819,47 @@ class Rule(object):
 
     def inject_update_edge_attrs(self, n1, n2, attrs):
         """Inject an update of edge attrs by the rule."""
+        for k1, k2 in self._lhs_edge_preimages(n1, n2, "update"):
+            self.p.update_edge_attrs(k1, k2, dict())
+            self.rhs.update_edge_attrs(
+                self.p_rhs[k1],
+                self.p_rhs[k2],
+                attrs
+            )
+        return
+
+    def _lhs_edge_preimages(self, n1, n2, action):
+        """Get the pairs of `p` nodes mapped to an edge of the lhs.
+
+        The edge `n1->n2` is checked to exist in the lhs, and
+        its source and target not to be removed by the rule.
+        """
         if n1 not in self.lhs.nodes():
             raise RuleError(
-                "Node '%s' does not exist in the left hand side of the rule" %
-                n1
+                "Node '{}' does not exist in the left hand side "
+                "of the rule".format(n1)
             )
         if n2 not in self.lhs.nodes():
             raise RuleError(
-                "Node '%s' does not exist in the left hand side of the rule" %
-                n2
+                "Node '{}' does not exist in the left hand side "
+                "of the rule".format(n2)
             )
-        if (n1, n2) not in self.lhs.edges():
+        if not self.lhs.exists_edge(n1, n2):
             raise RuleError(
-                "Edge '%s->%s' does not exist in the left hand "
-                "side of the rule" % (n1, n2)
+                "Edge '{}->{}' does not exist in the left hand "
+                "side of the rule".format(n1, n2)
             )
 
-        p_keys_1 = keys_by_value(self.p_lhs, n1)
-        p_keys_2 = keys_by_value(self.p_lhs, n2)
+        p_keys_1 = self.p_lhs.keys_by_value(n1)
+        p_keys_2 = self.p_lhs.keys_by_value(n2)
 
-        if len(p_keys_1) == 0:
-            raise RuleError(
-                "Node '%s' is being removed by the rule, cannot update "
-                "attributes from the incident edge" %
-                n2
-            )
-        if len(p_keys_2) == 0:
-            raise RuleError(
-                "Node '%s' is being removed by the rule, cannot update "
-                "attributes from the incident edge" %
-                n1
-            )
-        for k1 in p_keys_1:
-            for k2 in p_keys_2:
-                self.p.update_edge_attrs(k1, k2, dict())
-                self.rhs.update_edge_attrs(
-                    self.p_rhs[k1],
-                    self.p_rhs[k2],
-                    attrs
+        for n, p_keys in [(n1, p_keys_1), (n2, p_keys_2)]:
+            if len(p_keys) == 0:
+                raise RuleError(
+                    "Node '{}' is being removed by the rule, cannot {} "
+                    "attributes from the incident edge".format(n, action)
                 )
-        return
+        return [(k1, k2) for k1 in p_keys_1 for k2 in p_keys_2]
 
     def to_json(self):
         """Convert the rule to JSON repr."""
@@ -738,7 +879,9 @@ class Rule(object):
         rhs = NXGraph.from_json(json_data["rhs"])
         p_lhs = json_data["p_lhs"]
         p_rhs = json_data["p_rhs"]
-        rule = cls(p, lhs, rhs, p_lhs, p_rhs)
+        # The graphs are freshly loaded, the rule can own them
+        # (the homomorphisms are copied by the rule)
+        rule = cls(p, lhs, rhs, p_lhs, p_rhs, copy_inputs=False)
         return rule
 
     # def apply_to(self, graph, instance=None, inplace=False):
@@ -797,7 +940,7 @@ class Rule(object):
         """
         nodes = set()
         for r_node in self.rhs.nodes():
-            p_nodes = keys_by_value(self.p_rhs, r_node)
+            p_nodes = self.p_rhs.keys_by_value(r_node)
             if len(p_nodes) == 0:
                 nodes.add(r_node)
         return nodes
@@ -812,15 +955,15 @@ class Rule(object):
         """
         edges = set()
         for s, t in self.rhs.edges():
-            s_p_nodes = keys_by_value(self.p_rhs, s)
-            t_p_nodes = keys_by_value(self.p_rhs, t)
+            s_p_nodes = self.p_rhs.keys_by_value(s)
+            t_p_nodes = self.p_rhs.keys_by_value(t)
             if len(s_p_nodes) == 0 or len(t_p_nodes) == 0:
                 edges.add((s, t))
             else:
                 found_edge = False
                 for s_p_node in s_p_nodes:
                     for t_p_node in t_p_nodes:
-                        if (s_p_node, t_p_node) in self.p.edges():
+                        if self.p.exists_edge(s_p_node, t_p_node):
                             found_edge = True
                 if not found_edge:
                     edges.add((s, t))
@@ -837,7 +980,7 @@ class Rule(object):
         """
         attrs = dict()
         for node in self.rhs.nodes():
-            p_nodes = keys_by_value(self.p_rhs, node)
+            p_nodes = self.p_rhs.keys_by_value(node)
             if len(p_nodes) == 0:
                 if len(self.rhs.get_node(node)) > 0:
                     attrs[node] = self.rhs.get_node(node)
@@ -860,15 +1003,15 @@ class Rule(object):
         """
         attrs = dict()
         for s, t in self.rhs.edges():
-            s_p_nodes = keys_by_value(self.p_rhs, s)
-            t_p_nodes = keys_by_value(self.p_rhs, t)
+            s_p_nodes = self.p_rhs.keys_by_value(s)
+            t_p_nodes = self.p_rhs.keys_by_value(t)
             if len(s_p_nodes) == 0 or len(t_p_nodes) == 0:
                 if len(self.rhs.get_edge(s, t)) > 0:
                     attrs[(s, t)] = self.rhs.get_edge(s, t)
             new_attrs = {}
             for s_p_node in s_p_nodes:
                 for t_p_node in t_p_nodes:
-                    if (s_p_node, t_p_node) in self.p.edges():
+                    if self.p.exists_edge(s_p_node, t_p_node):
                         new_attrs = attrs_union(
                             new_attrs,
                             dict_sub(
@@ -893,7 +1036,7 @@ class Rule(object):
         """
         nodes = dict()
         for node in self.rhs.nodes():
-            p_nodes = keys_by_value(self.p_rhs, node)
+            p_nodes = self.p_rhs.keys_by_value(node)
             if len(p_nodes) > 1:
                 nodes[node] = set(p_nodes)
         return nodes
@@ -908,7 +1051,7 @@ class Rule(object):
         """
         nodes = set()
         for node in self.lhs.nodes():
-            p_nodes = keys_by_value(self.p_lhs, node)
+            p_nodes = self.p_lhs.keys_by_value(node)
             if len(p_nodes) == 0:
                 nodes.add(node)
         return nodes
@@ -923,12 +1066,12 @@ class Rule(object):
         """
         edges = set()
         for s, t in self.lhs.edges():
-            s_p_nodes = keys_by_value(self.p_lhs, s)
-            t_p_nodes = keys_by_value(self.p_lhs, t)
+            s_p_nodes = self.p_lhs.keys_by_value(s)
+            t_p_nodes = self.p_lhs.keys_by_value(t)
             if len(s_p_nodes) != 0 and len(t_p_nodes) != 0:
                 for s_p_node in s_p_nodes:
                     for t_p_node in t_p_nodes:
-                        if (s_p_node, t_p_node) not in self.p.edges():
+                        if not self.p.exists_edge(s_p_node, t_p_node):
                             edges.add((s_p_node, t_p_node))
         return edges
 
@@ -943,7 +1086,7 @@ class Rule(object):
         """
         attrs = dict()
         for node in self.lhs.nodes():
-            p_nodes = keys_by_value(self.p_lhs, node)
+            p_nodes = self.p_lhs.keys_by_value(node)
             for p_node in p_nodes:
                 new_attrs = dict_sub(
                     self.lhs.get_node(node), self.p.get_node(p_node))
@@ -963,11 +1106,11 @@ class Rule(object):
         """
         attrs = dict()
         for s, t in self.lhs.edges():
-            s_p_nodes = keys_by_value(self.p_lhs, s)
-            t_p_nodes = keys_by_value(self.p_lhs, t)
+            s_p_nodes = self.p_lhs.keys_by_value(s)
+            t_p_nodes = self.p_lhs.keys_by_value(t)
             for s_p_node in s_p_nodes:
                 for t_p_node in t_p_nodes:
-                    if (s_p_node, t_p_node) in self.p.edges():
+                    if self.p.exists_edge(s_p_node, t_p_node):
                         new_attrs = dict_sub(
                             self.lhs.get_edge(s, t),
                             self.p.get_edge(s_p_node, t_p_node)
@@ -988,7 +1131,7 @@ class Rule(object):
         """
         nodes = dict()
         for node in self.lhs.nodes():
-            p_nodes = keys_by_value(self.p_lhs, node)
+            p_nodes = self.p_lhs.keys_by_value(node)
             if len(p_nodes) > 1:
                 nodes[node] = set(p_nodes)
         return nodes
@@ -1090,15 +1233,15 @@ class Rule(object):
             return new_p_node_id, new_rhs_node_id
         else:
             raise RuleError(
-                "Node '%s' already exists in the left-hand side "
-                "of the rule" % node_id)
+                "Node '{}' already exists in the left-hand side "
+                "of the rule".format(node_id))
 
     def _add_edge_lhs(self, source, target, attrs=None):
-        if (source, target) not in self.lhs.edges():
+        if not self.lhs.exists_edge(source, target):
             if source in self.lhs.nodes() and target in self.rhs.nodes():
                 self.lhs.add_edge(source, target, attrs)
-                p_sources = keys_by_value(self.p_lhs, source)
-                p_targets = keys_by_value(self.p_lhs, target)
+                p_sources = self.p_lhs.keys_by_value(source)
+                p_targets = self.p_lhs.keys_by_value(target)
                 if len(p_sources) > 0 and len(p_targets) > 0:
                     for p_s in p_sources:
                         for p_t in p_targets:
@@ -1116,11 +1259,12 @@ class Rule(object):
                 "of the rule".format(source, target))
 
     def _add_edge_attrs_lhs(self, source, target, attrs=None):
-        if (source, target) in self.lhs.edges():
+        if self.lhs.exists_edge(source, target):
             self.lhs.add_edge_attrs(source, target, attrs)
-            for s_p_node in keys_by_value(self.p_lhs, source):
-                for t_p_node in keys_by_value(self.p_lhs, target):
-                    if (s_p_node, t_p_node) in self.p.edges():
+            t_p_nodes = self.p_lhs.keys_by_value(target)
+            for s_p_node in self.p_lhs.keys_by_value(source):
+                for t_p_node in t_p_nodes:
+                    if self.p.exists_edge(s_p_node, t_p_node):
                         self.p.add_edge_attrs(s_p_node, t_p_node, attrs)
                         self.rhs.add_edge_attrs(
                             self.p_rhs[s_p_node], self.p_rhs[t_p_node], attrs)
@@ -1138,12 +1282,17 @@ class Rule(object):
         """
         if node_id in self.lhs.nodes():
             self.lhs.remove_node(node_id)
-            p_nodes = keys_by_value(self.p_lhs, node_id)
+            p_nodes = self.p_lhs.keys_by_value(node_id)
+            # several clones of the node can be merged in the rhs,
+            # each image is removed once
+            rhs_nodes = set()
             for p in p_nodes:
                 self.p.remove_node(p)
-                self.rhs.remove_node(self.p_rhs[p])
+                rhs_nodes.add(self.p_rhs[p])
                 del self.p_lhs[p]
                 del self.p_rhs[p]
+            for r in rhs_nodes:
+                self.rhs.remove_node(r)
 
     def _remove_node_rhs(self, node_id):
         """Remove a node from the `rhs`.
@@ -1152,7 +1301,7 @@ class Rule(object):
         if there exist nodes from `p` that map to this node
         they are removed as well.
         """
-        p_keys = keys_by_value(self.p_rhs, node_id)
+        p_keys = self.p_rhs.keys_by_value(node_id)
         for p_node in p_keys:
             self.p.remove_node(p_node)
             del self.p_rhs[p_node]
@@ -1170,19 +1319,20 @@ class Rule(object):
     def _remove_edge_rhs(self, node1, node2):
         """Remove edge from the rhs of the graph."""
         self.rhs.remove_edge(node1, node2)
-        for pn1 in keys_by_value(self.p_rhs, node1):
-            for pn2 in keys_by_value(self.p_rhs, node2):
-                if (pn1, pn2) in self.p.edges():
+        p_nodes_2 = self.p_rhs.keys_by_value(node2)
+        for pn1 in self.p_rhs.keys_by_value(node1):
+            for pn2 in p_nodes_2:
+                if self.p.exists_edge(pn1, pn2):
                     self.p.remove_edge(pn1, pn2)
 
     def _clone_rhs_node(self, node, new_name=None):
         """Clone an rhs node."""
         if node not in self.rhs.nodes():
             raise RuleError(
-                "Node '%s' is not a node of right hand side" %
-                node
+                "Node '{}' is not a node of right hand side".format(
+                    node)
             )
-        p_keys = keys_by_value(self.p_rhs, node)
+        p_keys = self.p_rhs.keys_by_value(node)
         if len(p_keys) == 0:
             self.rhs.clone_node(node, new_name)
         elif len(p_keys) == 1:
@@ -1196,9 +1346,9 @@ class Rule(object):
     def _merge_nodes_rhs(self, n1, n2, new_name):
         """Merge nodes in rhs."""
         if n1 not in self.rhs.nodes():
-            raise RuleError("Node '%s' is not a node of the rhs" % n1)
+            raise RuleError("Node '{}' is not a node of the rhs".format(n1))
         if n2 not in self.rhs.nodes():
-            raise RuleError("Node '%s' is not a node of the rhs" % n2)
+            raise RuleError("Node '{}' is not a node of the rhs".format(n2))
         self.rhs.merge_nodes([n1, n2], node_id=new_name)
         for (source, target) in self.p_rhs.items():
             if target == n1 or target == n2:
@@ -1208,18 +1358,18 @@ class Rule(object):
         """Add attrs to a node in the rhs."""
         if n not in self.rhs.nodes():
             raise RuleError(
-                "Node %s does not exist in the right "
-                "hand side of the rule" % n)
+                "Node '{}' does not exist in the right "
+                "hand side of the rule".format(n))
         self.rhs.add_node_attrs(n, attrs)
 
     def _remove_node_attrs_rhs(self, n, attrs):
         """Remove attrs of a node in the rhs."""
         if n not in self.rhs.nodes():
             raise RuleError(
-                "Node '%s' does not exist in the right hand "
-                "side of the rule" % n)
+                "Node '{}' does not exist in the right hand "
+                "side of the rule".format(n))
 
-        p_keys = keys_by_value(self.p_rhs, n)
+        p_keys = self.p_rhs.keys_by_value(n)
         for p_node in p_keys:
             self.p.remove_node_attrs(p_node, attrs)
         self.rhs.remove_node_attrs(n, attrs)
@@ -1228,32 +1378,27 @@ class Rule(object):
         """Remove attrs of a node in the p."""
         if n not in self.p.nodes():
             raise RuleError(
-                "Node '%s' does not exist in the preserved "
-                "part of the rule" % n)
+                "Node '{}' does not exist in the preserved "
+                "part of the rule".format(n))
         self.p.remove_node_attrs(n, attrs)
 
     def _merge_node_list(self, node_list, node_name=None):
         """Merge a list of nodes."""
         if len(node_list) > 1:
-            node_name = self.merge_nodes(
-                node_list[0],
-                node_list[1],
-                node_name)
-            for i in range(2, len(node_list)):
-                node_name = self.merge_nodes(
-                    node_list[i], node_name, node_name)
+            node_name = self.inject_merge_nodes(node_list, node_name)
         else:
             warnings.warn(
                 "Cannot merge less than two nodes!", ReGraphWarning
             )
+        return node_name
 
     def _add_node_attrs_lhs(self, n, attrs):
         if n not in self.lhs.nodes():
             raise RuleError(
-                "Node '%s' does not exist in the lhs "
-                "of the rule" % n)
+                "Node '{}' does not exist in the lhs "
+                "of the rule".format(n))
         self.lhs.add_node_attrs(n, attrs)
-        p_nodes = keys_by_value(self.p_rhs, n)
+        p_nodes = self.p_rhs.keys_by_value(n)
         for p_node in p_nodes:
             self.p.add_node_attrs(p_node, attrs)
             self.rhs.add_node_attrs(self.p_rhs[p_node], attrs)
@@ -1327,8 +1472,8 @@ class Rule(object):
 
             def add_preserved_edges(lhs_source, lhs_target, edge_attrs, removed_edges):
                 # Add preserved edges
-                p_sources = keys_by_value(self.p_lhs, lhs_source)
-                p_targets = keys_by_value(self.p_lhs, lhs_target)
+                p_sources = self.p_lhs.keys_by_value(lhs_source)
+                p_targets = self.p_lhs.keys_by_value(lhs_target)
                 for sp in p_sources:
                     for tp in p_targets:
                         if (sp, tp) not in removed_edges:
@@ -1437,7 +1582,7 @@ class Rule(object):
     @classmethod
     def identity_rule(cls):
         """Create an identity rule."""
-        return cls(NXGraph(), NXGraph(), NXGraph())
+        return cls(NXGraph(), NXGraph(), NXGraph(), copy_inputs=False)
 
     def is_identity(self):
         """Test if the rule is identity."""
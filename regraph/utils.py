@@ -1,11 +1,15 @@
 """A collection of utils for ReGraph library."""
 import copy
+import logging
 
-from regraph.command_parser import parser
+from regraph.command_parser import parse_command
 from regraph.exceptions import ReGraphError, ParsingError, RewritingError
 from regraph.attribute_sets import AttributeSet, FiniteSet
 
 
+logger = logging.getLogger(__name__)
+
+
 def set_attrs(old_attrs, attrs, normalize=True, update=True):
     if normalize:
         normalize_attrs(attrs)
@@ -251,11 +255,12 @@ def attrs_union(attrs1, attrs2):
 
 def keys_by_value(dictionary, val):
     """Get keys of a dictionary by a value."""
-    res = []
-    for key, value in dictionary.items():
-        if value == val:
-            res.append(key)
-    return res
+    # Mappings maintaining a reverse index (e.g. `Rule.p_lhs`)
+    # answer the lookup without scanning
+    indexed_lookup = getattr(dictionary, "keys_by_value", None)
+    if indexed_lookup is not None:
+        return indexed_lookup(val)
+    return [key for key, value in dictionary.items() if value == val]
 
 
 def fold_left(f, init, l):
@@ -344,8 +349,8 @@ def simplify_commands(commands, di=False):
     actions = []
     for command in command_strings:
         try:
-            print(command)
-            parsed = parser.parseString(command).asDict()
+            logger.debug("Parsing command '%s'", command)
+            parsed = parse_command(command)
             actions.append(parsed)
         except:
             raise ParsingError("Cannot parse command '%s'" % command)
@@ -738,7 +743,7 @@ def make_canonical_commands(g, commands, di=False):
         actions = []
         for command in command_strings:
             try:
-                parsed = parser.parseString(command).asDict()
+                parsed = parse_command(command)
                 actions.append(parsed)
             except:
                 raise ParsingError("Cannot parse command '%s'" % command)
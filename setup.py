@@ -38,7 +38,7 @@ setuptools.setup(
         "lrparsing",
         "sympy",
         "greenery",
-        "neo4j-driver",
+        "neo4j>=1.7",
         "neobolt"
     ]
 )
@@ -0,0 +1,66 @@
+"""Fixtures shared by the test modules."""
+from collections import namedtuple
+
+import pytest
+
+from regraph.backends.networkx.graphs import NXGraph
+from regraph import Rule
+
+
+# Attributes of the rule input graphs (the graph methods copy the
+# attributes they are given before normalizing them)
+NODE_ATTRS = {'a': 1}
+EDGE_ATTRS = {'a': {1}}
+
+
+RuleInputs = namedtuple(
+    "RuleInputs", ["pattern", "p", "rhs", "p_lhs", "p_rhs"])
+
+
+@pytest.fixture(scope="module")
+def inputs():
+    """Graphs and homomorphisms of the test rule.
+
+    The inputs are built once per module and shared by its tests,
+    the tests should not modify them.
+    """
+    # Define the left hand side of the rule
+    pattern = NXGraph()
+    pattern.add_nodes_from([1, 2, 3, (4, NODE_ATTRS)])
+    pattern.add_edges_from([
+        (1, 2),
+        (3, 2),
+        (4, 1),
+        (2, 3, EDGE_ATTRS)
+    ])
+
+    # Define preserved part of the rule
+    p = NXGraph()
+    p.add_nodes_from(['a', 'b', 'c', ('d', NODE_ATTRS)])
+    p.add_edges_from([
+        ('a', 'b'),
+        ('d', 'a'),
+        ('b', 'c', EDGE_ATTRS)
+    ])
+
+    # Define the right hand side of the rule
+    rhs = NXGraph()
+    rhs.add_nodes_from(['x', 'y', 'z', ('s', NODE_ATTRS), 't'])
+    rhs.add_edges_from([
+        ('x', 'y'),
+        ('s', 'x'),
+        ('t', 'y'),
+        ('y', 'z', EDGE_ATTRS)
+    ])
+
+    # Define mappings
+    p_lhs = {'a': 1, 'b': 2, 'c': 3, 'd': 4}
+    p_rhs = {'a': 'x', 'b': 'y', 'c': 'z', 'd': 's'}
+    return RuleInputs(pattern, p, rhs, p_lhs, p_rhs)
+
+
+@pytest.fixture
+def rule(inputs):
+    """Fresh rule built from the shared inputs (the rule copies them)."""
+    return Rule(
+        inputs.p, inputs.pattern, inputs.rhs, inputs.p_lhs, inputs.p_rhs)
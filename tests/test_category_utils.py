@@ -1,8 +1,6 @@
 import networkx as nx
 import copy
 
-from nose.tools import assert_equals
-
 from regraph import (print_graph,
                      NXGraph)
 # from regraph.utils import assert_nx_graph_eq
@@ -23,7 +21,7 @@ def assert_edges_undir(edges1, edges2):
 
 
 class TestCategoryUtils:
-    def __init__(self):
+    def setup_method(self):
         D = NXGraph()
 
         D.add_node('square')
@@ -91,17 +89,17 @@ class TestCategoryUtils:
         A, homAB, homAC = pullback(
             self.B, self.C, self.D, self.homBD, self.homCD,
         )
-        assert_equals(type(A), NXGraph)
-        assert_equals(set(A.nodes()), set(self.A.nodes()))
+        assert(type(A) == NXGraph)
+        assert(set(A.nodes()) == set(self.A.nodes()))
         assert_edges_undir(A.edges(), self.A.edges())
-        assert_equals(homAB, self.homAB)
-        assert_equals(homAC, self.homAC)
+        assert(homAB == self.homAB)
+        assert(homAC == self.homAC)
 
     def test_pullback_complement(self):
         C, homAC, homCD = pullback_complement(
             self.A, self.B, self.D, self.homAB, self.homBD
         )
-        assert_equals(type(C), NXGraph)
+        assert(type(C) == NXGraph)
         test_graph = self.C.get_relabeled_graph(
             {2: "circle", 3: "dark_circle", "dark_square": "dark_square"}
         )
@@ -114,7 +112,7 @@ class TestCategoryUtils:
         C, homAC, homCD = pullback_complement(
             self.A, self.B, D_copy, self.homAB, self.homBD, inplace=True
         )
-        assert_equals(type(C), NXGraph)
+        assert(type(C) == NXGraph)
         test_graph = self.C.get_relabeled_graph(
             {2: "circle", 3: "dark_circle", "dark_square": "dark_square"}
         )
@@ -125,13 +123,11 @@ class TestCategoryUtils:
         D, homBD, homCD = pushout(
             self.A, self.B, self.C, self.homAB, self.homAC
         )
-        assert_equals(type(D), NXGraph)
+        assert(type(D) == NXGraph)
 
-        assert_equals(len(D.nodes()),
-                      len(self.D.nodes()))
+        assert(len(D.nodes()) == len(self.D.nodes()))
 
-        assert_equals(len(D.edges()),
-                      len(self.D.edges()))
+        assert(len(D.edges()) == len(self.D.edges()))
         assert(id(self.B) != id(D))
 
     def test_pushout_inplace(self):
@@ -139,13 +135,11 @@ class TestCategoryUtils:
         D, homBD, homCD = pushout(
             self.A, B_copy, self.C, self.homAB, self.homAC, inplace=True
         )
-        assert_equals(type(D), NXGraph)
+        assert(type(D) == NXGraph)
 
-        assert_equals(len(D.nodes()),
-                      len(self.D.nodes()))
+        assert(len(D.nodes()) == len(self.D.nodes()))
 
-        assert_equals(len(D.edges()),
-                      len(self.D.edges()))
+        assert(len(D.edges()) == len(self.D.edges()))
         assert(id(B_copy) == id(D))
 
     def test_pushout_symmetry_directed(self):
@@ -171,8 +165,8 @@ class TestCategoryUtils:
         D_inv, homCD_inv, homBD_inv = pushout(
             A, C, B, homAC, homAB
         )
-        assert_equals(len(D.nodes()), len(D_inv.nodes()))
-        assert_equals(len(D.edges()), len(D_inv.edges()))
+        assert(len(D.nodes()) == len(D_inv.nodes()))
+        assert(len(D.edges()) == len(D_inv.edges()))
 
     def test_get_unique_map_to_pullback_complement(self):
         # a_b = {
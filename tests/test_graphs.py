@@ -14,7 +14,7 @@ matplotlib_log.setLevel(logging.WARNING)
 class TestGraphClasses:
     """Main test class."""
 
-    def __init__(self):
+    def setup_method(self):
         """Initialize test object."""
         self.nx_graph = NXGraph()
         try:
@@ -2,7 +2,7 @@
 import copy
 import warnings
 
-from nose.tools import raises
+import pytest
 
 from regraph import Rule
 from regraph import NXGraph
@@ -23,7 +23,7 @@ matplotlib_log.setLevel(logging.WARNING)
 class TestHierarchy(object):
     """Class for testing hierarchy data structure."""
 
-    def __init__(self):
+    def setup_method(self):
         """Initialize hierarchies."""
         self.nx_hierarchy = NXHierarchy()
         try:
@@ -265,19 +265,20 @@ class TestHierarchy(object):
         # add nice assertions here!
         return
 
-    @raises(HierarchyError)
     def test_add_typing_cycle(self):
-        self.nx_hierarchy.add_typing(
-            "g0", "g1",
-            {"circle": "black_circle",
-             "square": "white_square",
-             "triangle": "black_triangle"})
-        if self.neo4j_hierarchy:
-            self.neo4j_hierarchy.add_typing(
+        with pytest.raises(HierarchyError):
+            self.nx_hierarchy.add_typing(
                 "g0", "g1",
                 {"circle": "black_circle",
                  "square": "white_square",
                  "triangle": "black_triangle"})
+        if self.neo4j_hierarchy:
+            with pytest.raises(HierarchyError):
+                self.neo4j_hierarchy.add_typing(
+                    "g0", "g1",
+                    {"circle": "black_circle",
+                     "square": "white_square",
+                     "triangle": "black_triangle"})
 
     # def test_remove_graph(self):
     #     h = copy.deepcopy(self.hierarchy)
@@ -738,7 +739,6 @@ class TestHierarchy(object):
     #     assert("g3" in anc.keys())
     #     assert("g4" in anc.keys())
 
-    @raises(HierarchyError)
     def test_add_typing_advanced(self):
         hierarchy = NXHierarchy()
 
@@ -876,15 +876,16 @@ class TestHierarchy(object):
                 "t_x_a": "1_a",
                 "g_y_b": "1_b"
             })
-        hierarchy.add_typing(
-            6, 9,
-            {
-                "a_x_a": "a",
-                "b_x_a": "b",
-                "a_y_b": "b",
-                "b_y_a": "a",
-                "c_x_b": "b"
-            })
+        with pytest.raises(HierarchyError):
+            hierarchy.add_typing(
+                6, 9,
+                {
+                    "a_x_a": "a",
+                    "b_x_a": "b",
+                    "a_y_b": "b",
+                    "b_y_a": "a",
+                    "c_x_b": "b"
+                })
 
     @staticmethod
     def _generate_triangle_hierarchy():
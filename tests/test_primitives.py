@@ -9,7 +9,7 @@ from regraph.primitives import *
 
 class TestPrimitives(object):
 
-    def __init__(self):
+    def setup_method(self):
         self.graph = NXGraph()
         add_node(self.graph, '1', {'name': 'EGFR', 'state': 'p'})
         add_node(self.graph, '2', {'name': 'BND'})
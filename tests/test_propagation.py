@@ -7,7 +7,7 @@ from regraph import primitives
 
 class TestPropagation(object):
 
-    def __init__(self):
+    def setup_method(self):
         hierarchy = NXHierarchy()
         colors = NXGraph()
         primitives.add_nodes_from(
@@ -10,7 +10,7 @@ import regraph.primitives as prim
 
 class TestRelations(object):
 
-    def __init__(self):
+    def setup_method(self):
         hierarchy = NXHierarchy()
 
         base = NXGraph()
@@ -28,7 +28,7 @@ def valid_hierarchy(rule_hierarchy):
 class TestRuleHierarchies(object):
     """Test class for testing rule projections."""
 
-    def __init__(self):
+    def setup_method(self):
         """Init test hierarchy."""
         self.hierarchy = NXHierarchy()
 
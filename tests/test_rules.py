@@ -1,3 +1,9 @@
+import copy
+import pickle
+
+import networkx as nx
+import pytest
+
 from regraph.backends.networkx.graphs import NXGraph
 from regraph import Rule
 from regraph.rules import compose_rules, _create_merging_rule
@@ -7,64 +13,86 @@ from regraph.category_utils import check_homomorphism
 import regraph.primitives as prim
 
 
+# Attributes set by the update tests (the update methods normalize
+# their input in place, a copy should be passed)
+_UPDATED_ATTRS = {"b": {2}}
+
+
+# Attribute-free pattern 1->2<-3 used by most of the injection tests
+_STRUCTURAL_NODES = (1, 2, 3)
+_STRUCTURAL_EDGES = ((1, 2), (3, 2))
+
+
+def _structural_pattern():
+    """Build the attribute-free pattern directly from its adjacency."""
+    graph = nx.DiGraph()
+    graph.add_nodes_from(_STRUCTURAL_NODES)
+    graph.add_edges_from(_STRUCTURAL_EDGES)
+    return NXGraph(graph)
+
+
+def _graph_signature(graph):
+    """Fingerprint of the nodes, edges and attributes of a graph."""
+    return (
+        tuple(sorted(graph.nodes(data=True), key=lambda n: str(n[0]))),
+        tuple(sorted(
+            graph.edges(data=True), key=lambda e: (str(e[0]), str(e[1]))))
+    )
+
+
+@pytest.fixture(scope="module")
+def pattern_signature(inputs):
+    """Signature of the pattern (kept by the lhs of its rules)."""
+    return _graph_signature(inputs.pattern)
+
+
+@pytest.fixture(scope="module")
+def identity_rule_pickle(inputs):
+    """Pickled identity rule on the pattern."""
+    return pickle.dumps(
+        Rule.from_transform(inputs.pattern),
+        protocol=pickle.HIGHEST_PROTOCOL)
+
+
+@pytest.fixture
+def identity_rule(identity_rule_pickle):
+    """Fresh identity rule on the pattern (unpickled from a prototype)."""
+    return pickle.loads(identity_rule_pickle)
+
+
 class TestRule(object):
     """Class for testing `regraph.rules` module."""
 
-    def __init__(self):
-        """Initialize test."""
-        # Define the left hand side of the rule
-        self.pattern = NXGraph()
-        self.pattern.add_node(1)
-        self.pattern.add_node(2)
-        self.pattern.add_node(3)
-        self.pattern.add_node(4, {'a': 1})
-
-        self.pattern.add_edges_from([
-            (1, 2),
-            (3, 2),
-            (4, 1)
-        ])
-        self.pattern.add_edge(2, 3, {'a': {1}})
-
-        # Define preserved part of the rule
-        self.p = NXGraph()
-        self.p.add_node('a')
-        self.p.add_node('b')
-        self.p.add_node('c')
-        self.p.add_node('d', {'a': 1})
-
-        self.p.add_edges_from([
-            ('a', 'b'),
-            ('d', 'a')
-        ])
-        self.p.add_edge('b', 'c', {'a': {1}})
-
-        # Define the right hand side of the rule
-        self.rhs = NXGraph()
-        self.rhs.add_node('x')
-        self.rhs.add_node('y')
-        self.rhs.add_node('z')
-        # self.rhs.add_node('s', {'a': 1})
-        self.rhs.add_node('s', {'a': 1})
-        self.rhs.add_node('t')
-
-        self.rhs.add_edges_from([
-            ('x', 'y'),
-            # ('y', 'z', {'a': {1}}),
-            ('s', 'x'),
-            ('t', 'y')
-        ])
-        self.rhs.add_edge('y', 'z', {'a': {1}})
-
-        # Define mappings
-        self.p_lhs = {'a': 1, 'b': 2, 'c': 3, 'd': 4}
-        self.p_rhs = {'a': 'x', 'b': 'y', 'c': 'z', 'd': 's'}
-        return
+    def test_rule_input_copies(self, inputs, pattern_signature):
+        rule = Rule.from_transform(inputs.pattern)
+        assert(rule.lhs is not inputs.pattern)
+        assert(rule.p is not rule.lhs and rule.rhs is not rule.lhs)
+        rule.inject_remove_node(1)
+        assert(1 in inputs.pattern.nodes())
+        assert(_graph_signature(rule.lhs) == pattern_signature)
+
+        rule = Rule(inputs.p, inputs.pattern, inputs.rhs,
+                    inputs.p_lhs, inputs.p_rhs, copy_inputs=False)
+        assert(rule.p is inputs.p)
+        assert(rule.lhs is inputs.pattern)
+        assert(rule.p_lhs is not inputs.p_lhs)
+
+        rule = Rule(inputs.p, copy_inputs=False)
+        assert(rule.lhs is not rule.p and rule.rhs is not rule.p)
+
+    def test_rule_pickling(self, rule, inputs, identity_rule_pickle,
+                           pattern_signature):
+        loaded = pickle.loads(pickle.dumps(rule))
+        assert(loaded == rule)
+        assert(loaded.p_rhs.keys_by_value('x') == ['a'])
+        identity_rule = pickle.loads(identity_rule_pickle)
+        assert(identity_rule == Rule.from_transform(inputs.pattern))
+        assert(_graph_signature(identity_rule.lhs) == pattern_signature)
+        assert(
+            identity_rule.lhs is not pickle.loads(identity_rule_pickle).lhs)
 
     def test_inject_remove_node(self):
-        pattern = NXGraph()
-        pattern.add_nodes_from([1, 2, 3])
-        pattern.add_edges_from([(1, 2), (3, 2)])
+        pattern = _structural_pattern()
         rule = Rule.from_transform(pattern)
         rule.inject_remove_node(2)
         check_homomorphism(rule.p, rule.lhs, rule.p_lhs)
@@ -73,10 +101,18 @@ class TestRule(object):
         assert(2 not in rule.p.nodes())
         assert(2 not in rule.rhs.nodes())
 
+    def test_remove_merged_clones(self, identity_rule):
+        rule = identity_rule
+        p_clone, _ = rule.inject_clone_node(2)
+        rule.inject_merge_nodes([2, p_clone])
+        rule._remove_node_lhs(2)
+        assert(2 not in rule.lhs.nodes())
+        assert(set(rule.p.nodes()) == {1, 3, 4})
+        assert(set(rule.rhs.nodes()) == {1, 3, 4})
+        check_homomorphism(rule.p, rule.rhs, rule.p_rhs)
+
     def test_inject_clone_node(self):
-        pattern = NXGraph()
-        pattern.add_nodes_from([1, 2, 3])
-        pattern.add_edges_from([(1, 2), (3, 2)])
+        pattern = _structural_pattern()
         rule = Rule.from_transform(pattern)
         new_p_node, new_rhs_node = rule.inject_clone_node(2)
         check_homomorphism(rule.p, rule.lhs, rule.p_lhs)
@@ -84,10 +120,10 @@ class TestRule(object):
         assert(new_p_node in rule.p.nodes())
         assert(new_rhs_node in rule.rhs.nodes())
         assert(rule.p_rhs[new_p_node] == new_rhs_node)
-        assert((1, new_p_node) in rule.p.edges())
-        assert((3, new_p_node) in rule.p.edges())
-        assert((1, new_rhs_node) in rule.rhs.edges())
-        assert((3, new_rhs_node) in rule.rhs.edges())
+        assert(rule.p.exists_edge(1, new_p_node))
+        assert(rule.p.exists_edge(3, new_p_node))
+        assert(rule.rhs.exists_edge(1, new_rhs_node))
+        assert(rule.rhs.exists_edge(3, new_rhs_node))
         new_p_node, new_rhs_node = rule.inject_clone_node(2)
         assert(len(keys_by_value(rule.p_lhs, 2)) == 3)
         check_homomorphism(rule.p, rule.lhs, rule.p_lhs)
@@ -100,20 +136,18 @@ class TestRule(object):
             pass
 
     def test_inject_remove_edge(self):
-        pattern = NXGraph()
-        pattern.add_nodes_from([1, 2, 3])
-        pattern.add_edges_from([(1, 2), (3, 2)])
+        pattern = _structural_pattern()
         rule = Rule.from_transform(pattern)
         rule.inject_remove_edge(3, 2)
         check_homomorphism(rule.p, rule.lhs, rule.p_lhs)
         check_homomorphism(rule.p, rule.rhs, rule.p_rhs)
-        assert((3, 2) not in rule.p.nodes())
+        assert(not rule.p.exists_edge(3, 2))
         new_name, _ = rule.inject_clone_node(2)
         rule.inject_remove_edge(1, new_name)
         check_homomorphism(rule.p, rule.lhs, rule.p_lhs)
         check_homomorphism(rule.p, rule.rhs, rule.p_rhs)
-        assert((1, new_name) not in rule.p.edges())
-        assert((1, 2) in rule.p.edges())
+        assert(not rule.p.exists_edge(1, new_name))
+        assert(rule.p.exists_edge(1, 2))
 
     def test_inject_remove_node_attrs(self):
         pattern = NXGraph()
@@ -153,9 +187,7 @@ class TestRule(object):
         assert("a32" not in rule.rhs.get_edge(3, new_rhs_node))
 
     def test_inject_add_node(self):
-        pattern = NXGraph()
-        pattern.add_nodes_from([1, 2, 3])
-        pattern.add_edges_from([(1, 2), (3, 2)])
+        pattern = _structural_pattern()
         rule = Rule.from_transform(pattern)
         try:
             rule.inject_add_node(3)
@@ -170,20 +202,18 @@ class TestRule(object):
                4 not in rule.p.nodes())
 
     def test_inject_add_edge(self):
-        pattern = NXGraph()
-        pattern.add_nodes_from([1, 2, 3])
-        pattern.add_edges_from([(1, 2), (3, 2)])
+        pattern = _structural_pattern()
         rule = Rule.from_transform(pattern)
         rule.inject_add_node(4)
         rule.inject_add_edge(1, 4)
         check_homomorphism(rule.p, rule.lhs, rule.p_lhs)
         check_homomorphism(rule.p, rule.rhs, rule.p_rhs)
-        assert((1, 4) in rule.rhs.edges())
+        assert(rule.rhs.exists_edge(1, 4))
         merge_node = rule.inject_merge_nodes([1, 2])
         rule.inject_add_edge(merge_node, 3)
         check_homomorphism(rule.p, rule.lhs, rule.p_lhs)
         check_homomorphism(rule.p, rule.rhs, rule.p_rhs)
-        assert((merge_node, 3) in rule.rhs.edges())
+        assert(rule.rhs.exists_edge(merge_node, 3))
         new_p_node, new_rhs_node = rule.inject_clone_node(2)
         # rule.inject_add_edge(new_rhs_node, merge_node)
         # check_homomorphism(rule.p, rule.lhs, rule.p_lhs)
@@ -191,15 +221,13 @@ class TestRule(object):
         # assert((new_rhs_node, merge_node) in rule.rhs.edges())
 
     def test_inject_merge_nodes(self):
-        pattern = NXGraph()
-        prim.add_nodes_from(pattern, [1, 2, 3])
-        prim.add_edges_from(pattern, [(1, 2), (3, 2)])
+        pattern = _structural_pattern()
         rule = Rule.from_transform(pattern)
         new_name = rule.inject_merge_nodes([1, 2])
         check_homomorphism(rule.p, rule.lhs, rule.p_lhs)
         check_homomorphism(rule.p, rule.rhs, rule.p_rhs)
-        assert((new_name, new_name) in rule.rhs.edges())
-        assert((3, new_name) in rule.rhs.edges())
+        assert(rule.rhs.exists_edge(new_name, new_name))
+        assert(rule.rhs.exists_edge(3, new_name))
         new_p_name, new_rhs_name = rule.inject_clone_node(2)
         check_homomorphism(rule.p, rule.lhs, rule.p_lhs)
         check_homomorphism(rule.p, rule.rhs, rule.p_rhs)
@@ -209,9 +237,7 @@ class TestRule(object):
         assert(new_rhs_name in rule.rhs.nodes())
 
     def test_inject_add_node_attrs(self):
-        pattern = NXGraph()
-        prim.add_nodes_from(pattern, [1, 2, 3])
-        prim.add_edges_from(pattern, [(1, 2), (3, 2)])
+        pattern = _structural_pattern()
         rule = Rule.from_transform(pattern)
         clone_name_p, clone_name_rhs = rule.inject_clone_node(2)
         rule.inject_add_node(4)
@@ -250,11 +276,45 @@ class TestRule(object):
         check_homomorphism(rule.p, rule.lhs, rule.p_lhs)
         check_homomorphism(rule.p, rule.rhs, rule.p_rhs)
 
-    def test_inject_update_node_attrs(self):
-        pass
-
-    def test_inject_update_edge_attrs(self):
-        pass
+    @pytest.mark.parametrize("update,element,get_attrs", [
+        ("inject_update_node_attrs", (4,),
+         lambda graph, element: graph.get_node(*element)),
+        ("inject_update_edge_attrs", (2, 3),
+         lambda graph, element: graph.get_edge(*element)),
+    ])
+    def test_inject_update_attrs(self, identity_rule, update, element,
+                                 get_attrs):
+        rule = identity_rule
+        getattr(rule, update)(*element, copy.deepcopy(_UPDATED_ATTRS))
+        check_homomorphism(rule.p, rule.lhs, rule.p_lhs)
+        check_homomorphism(rule.p, rule.rhs, rule.p_rhs)
+        assert("a" in get_attrs(rule.lhs, element))
+        assert(get_attrs(rule.p, element) == {})
+        assert("a" not in get_attrs(rule.rhs, element))
+        assert(2 in get_attrs(rule.rhs, element)["b"])
+
+        rule.inject_remove_node(element[0])
+        with pytest.raises(RuleError):
+            getattr(rule, update)(*element, copy.deepcopy(_UPDATED_ATTRS))
+
+    def test_reverse_index(self, identity_rule, pattern_signature):
+        rule = identity_rule
+        p_clone, _ = rule.inject_clone_node(2)
+        merged = rule.inject_merge_nodes([1, 3])
+        rule.inject_remove_node(4)
+        for mapping in [rule.p_lhs, rule.p_rhs]:
+            for v in set(mapping.values()):
+                assert(mapping.keys_by_value(v) == keys_by_value(dict(mapping), v))
+        assert(set(rule.p_lhs.keys_by_value(2)) == {2, p_clone})
+        assert(set(rule.p_rhs.keys_by_value(merged)) == {1, 3})
+        assert(rule.p_lhs.keys_by_value(4) == [])
+        assert(_graph_signature(rule.lhs) == pattern_signature)
+
+        p_lhs = rule.p_lhs
+        p_lhs |= {p_clone: 1}
+        assert(p_lhs is rule.p_lhs)
+        assert(rule.p_lhs.keys_by_value(1) == keys_by_value(dict(p_lhs), 1))
+        assert(rule.p_lhs.keys_by_value(2) == [2])
 
     # def test_from_script(self):
     #     commands = "clone 2 as '21'.\nadd_node 'a' {'a': 1}.\ndelete_node 3."
@@ -263,6 +323,20 @@ class TestRule(object):
     #     assert('21' in rule.rhs.nodes())
     #     assert(3 not in rule.rhs.nodes())
 
+    def test_from_transform_commands(self, inputs):
+        commands = (
+            "CLONE 2 AS 'clone'.\n" +
+            "DELETE_NODE 3.\n" +
+            "ADD_NODE 'new' {'b': {1}}.\n" +
+            "ADD_EDGE 'new' 1.\n"
+        )
+        rule = Rule.from_transform(inputs.pattern, [commands])
+        assert(set(rule.cloned_nodes()[2]) == {2, 'clone'})
+        assert(rule.removed_nodes() == {3})
+        assert(rule.added_nodes() == {'new'})
+        assert('b' in rule.rhs.get_node('new'))
+        assert(('new', 1) in rule.added_edges())
+
     def test_component_getters(self):
         pattern = NXGraph()
         prim.add_nodes_from(
@@ -538,4 +612,3 @@ class TestRule(object):
 
         rule1, rule2 = _create_merging_rule(
             rule, lhs_instance, rhs_instance)
-
@@ -17,7 +17,7 @@ matplotlib_log.setLevel(logging.WARNING)
 class TestVersioning(object):
     """Class for testing `regraph.audit` module."""
 
-    def __init__(self):
+    def setup_method(self):
         graph = NXGraph()
         graph.add_nodes_from(["circle", "square"])
         graph.add_edge("circle", "square")
@@ -74,9 +74,9 @@ class TestVersioning(object):
             rule, {"circle": "circle"},
             "Clone circle")
 
-        rhs_circle_clones = list({
-            rule.p_rhs[p] for p in rule.cloned_nodes()["circle"]
-        })
+        # Graph nodes of the original circle and of its clone
+        circle = rhs_instance["circle"]
+        circle_clone = rhs_instance[rhs_clone]
 
         # Remove original circle
         pattern = NXGraph()
@@ -84,9 +84,9 @@ class TestVersioning(object):
         rule = Rule.from_transform(pattern)
         rule.inject_remove_node("circle")
 
-        rhs_instance, _ = g.rewrite(
+        g.rewrite(
             rule,
-            {"circle": rhs_instance[rhs_circle_clones[0]]},
+            {"circle": circle},
             message="Remove circle")
 
         # Merge circle clone and triangle
@@ -98,7 +98,7 @@ class TestVersioning(object):
         rhs_instance, _ = g.rewrite(
             rule,
             {
-                "circle": rhs_instance[rhs_clone],
+                "circle": circle_clone,
                 "triangle": triangle
             },
             message="Merge circle and triangle")